@@ -0,0 +1,73 @@
+import math
+import threading
+
+
+class AdmissionController:
+    """Concurrency limit for frames entering inference, adapted to latency.
+
+    A frame is admitted while fewer than `limit` frames are in flight. Every
+    `adjust_every` completed frames, the p95 of the last `window` latencies
+    since the limit last changed is compared with the SLO: over it the limit
+    shrinks by a quarter, under half of it the limit grows by one, always
+    between 1 and max_in_flight. Frames over the limit are shed straight away
+    instead of queueing, so admitted frames keep a bounded latency.
+    """
+
+    def __init__(self, max_in_flight, latency_slo=0.25, window=200, adjust_every=16):
+        self.max_in_flight = max_in_flight
+        self.latency_slo = latency_slo
+        self.limit = max_in_flight
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.p95 = 0.0
+        self._latencies = [0.0] * window
+        self._count = 0
+        self._adjust_every = adjust_every
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self, seconds):
+        """Finish an admitted frame that took `seconds` from admission to response"""
+        with self._lock:
+            self.in_flight -= 1
+            latencies = self._latencies
+            latencies[self._count % len(latencies)] = seconds
+            self._count += 1
+            if self._count % self._adjust_every == 0:
+                self._adjust()
+
+    def _adjust(self):
+        recent = sorted(self._latencies[:min(self._count, len(self._latencies))])
+        self.p95 = recent[int(len(recent) * 0.95)]
+        limit = self.limit
+        if self.p95 > self.latency_slo:
+            limit = max(1, math.floor(limit * 0.75))
+        elif self.p95 < self.latency_slo / 2:
+            limit = min(self.max_in_flight, limit + 1)
+        if limit != self.limit:
+            # Judge the new limit only on latencies measured under it
+            self.limit = limit
+            self._count = 0
+
+    def retry_after(self):
+        """Whole seconds a shed client should wait before its next frame"""
+        return max(1, math.ceil(self.p95))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'limit': self.limit,
+                'in_flight': self.in_flight,
+                'admitted': self.admitted,
+                'shed': self.shed,
+                'p95_ms': self.p95 * 1000
+            }
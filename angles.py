@@ -0,0 +1,67 @@
+import numpy as np
+
+from landmarks import (
+    LEFT_ANKLE, LEFT_ELBOW, LEFT_HIP, LEFT_KNEE, LEFT_SHOULDER, LEFT_WRIST,
+    RIGHT_ANKLE, RIGHT_ELBOW, RIGHT_HIP, RIGHT_KNEE, RIGHT_SHOULDER, RIGHT_WRIST
+)
+
+# Reference point 0.1 above the vertex, for angles measured against vertical
+UP = (0.0, -0.1)
+
+# Joint name -> (a, b, c, offset of c): the angle a-b-c is measured at b in
+# the image plane. Joints measured against vertical use c = b + UP.
+JOINTS = {
+    'left_elbow': (LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST, (0.0, 0.0)),
+    'right_elbow': (RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST, (0.0, 0.0)),
+    'left_shoulder': (LEFT_ELBOW, LEFT_SHOULDER, LEFT_HIP, (0.0, 0.0)),
+    'right_shoulder': (RIGHT_ELBOW, RIGHT_SHOULDER, RIGHT_HIP, (0.0, 0.0)),
+    'left_hip': (LEFT_SHOULDER, LEFT_HIP, LEFT_KNEE, (0.0, 0.0)),
+    'right_hip': (RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE, (0.0, 0.0)),
+    'left_knee': (LEFT_HIP, LEFT_KNEE, LEFT_ANKLE, (0.0, 0.0)),
+    'right_knee': (RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE, (0.0, 0.0)),
+    'left_upper_arm_vertical': (LEFT_SHOULDER, LEFT_ELBOW, LEFT_ELBOW, UP),
+    'right_upper_arm_vertical': (RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_ELBOW, UP),
+}
+
+JOINT_NAMES = tuple(JOINTS)
+JOINT_INDEX = {name: i for i, name in enumerate(JOINT_NAMES)}
+
+_A = np.array([JOINTS[name][0] for name in JOINT_NAMES])
+_B = np.array([JOINTS[name][1] for name in JOINT_NAMES])
+_C = np.array([JOINTS[name][2] for name in JOINT_NAMES])
+_C_OFFSET = np.array([JOINTS[name][3] for name in JOINT_NAMES], dtype=np.float32)
+
+
+def joint_angles(landmarks, joints=None):
+    """Angles in degrees for every joint in JOINT_NAMES, in one batched pass.
+
+    Takes a (33, 4) landmark array and returns shape (len(JOINT_NAMES),), or an
+    (N, 33, 4) batch and returns (N, len(JOINT_NAMES)). joints, a list of
+    JOINT_INDEX values, restricts the result to those joints.
+    """
+    if joints is None:
+        a, b, c, c_offset = _A, _B, _C, _C_OFFSET
+    else:
+        a, b, c, c_offset = _A[joints], _B[joints], _C[joints], _C_OFFSET[joints]
+    xy = landmarks[..., :2]
+    b = xy[..., b, :]
+    ba = xy[..., a, :] - b
+    bc = xy[..., c, :] + c_offset - b
+
+    # atan2(|cross|, dot) needs no norms or clipping and stays accurate near 0 and 180
+    cross = ba[..., 0] * bc[..., 1] - ba[..., 1] * bc[..., 0]
+    dot = ba[..., 0] * bc[..., 0] + ba[..., 1] * bc[..., 1]
+    return np.degrees(np.abs(np.arctan2(cross, dot)))
+
+
+def calculate_angle(a, b, c):
+    a = np.array(a)
+    b = np.array(b)
+    c = np.array(c)
+
+    ba = a - b
+    bc = c - b
+
+    cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
+    angle = np.degrees(np.arccos(np.clip(cosine_angle, -1.0, 1.0)))
+    return angle
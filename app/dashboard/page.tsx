@@ -5,6 +5,10 @@ import './page.css';
 import * as tf from '@tensorflow/tfjs';
 import * as poseDetection from '@tensorflow-models/pose-detection';
 
+// Frames are sent no faster than the server's per-session limit (FRAME_RATE_PER_SESSION, 30/s by default)
+const MAX_FRAME_RATE = 30;
+const FRAME_INTERVAL_MS = 1000 / MAX_FRAME_RATE;
+
 const Home: React.FC = () => {
     const videoRef = useRef<HTMLVideoElement>(null);
     const canvasRef = useRef<HTMLCanvasElement>(null);
@@ -13,6 +17,8 @@ const Home: React.FC = () => {
     const [statusText, setStatusText] = useState<string>('Select an exercise to begin');
     const [isProcessing, setIsProcessing] = useState<boolean>(false);
     const [stream, setStream] = useState<MediaStream | null>(null);
+    const sessionIdRef = useRef<string>('');
+    const eventsRef = useRef<EventSource | null>(null);
 
     const setupCamera = async () => {
         try {
@@ -42,12 +48,31 @@ const Home: React.FC = () => {
     const startExercise = async (exercise: string) => {
         setCurrentExercise(exercise);
         setRepCounter(0);
+        sessionIdRef.current = crypto.randomUUID();
         setStatusText(`Starting ${exercise}...`);
+
+        // Rep counts arrive as server-sent events, only when something changes
+        eventsRef.current?.close();
+        const events = new EventSource(`http://localhost:3001/events/${sessionIdRef.current}`);
+        const onChange = (event: MessageEvent) => {
+            const data = JSON.parse(event.data);
+            setRepCounter(data.reps);
+            setStatusText(`${data.exercise_type}: ${data.stage}`);
+        };
+        events.addEventListener('rep', onChange);
+        events.addEventListener('stage', onChange);
+        events.addEventListener('warning', (event: MessageEvent) => {
+            const data = JSON.parse(event.data);
+            setStatusText(data.active ? 'Step into view of the camera' : `Tracking ${exercise}`);
+        });
+        eventsRef.current = events;
         await setupCamera();
         setup();
     };
 
     const exitExercise = () => {
+        eventsRef.current?.close();
+        eventsRef.current = null;
         setCurrentExercise(null);
         setRepCounter(0);
         setStatusText('Select an exercise to begin');
@@ -64,34 +89,53 @@ const Home: React.FC = () => {
         setIsProcessing(true);
         const context = canvasRef.current?.getContext('2d');
 
+        let lastSent = 0;
         const processFrame = async () => {
             if (!currentExercise || !context) {
                 setIsProcessing(false);
                 return;
             }
 
+            const wait = lastSent + FRAME_INTERVAL_MS - performance.now();
+            if (wait > 0) {
+                setTimeout(() => requestAnimationFrame(processFrame), wait);
+                return;
+            }
+            lastSent = performance.now();
+
             if (canvasRef.current && videoRef.current) {
                 canvasRef.current.width = videoRef.current.videoWidth;
                 canvasRef.current.height = videoRef.current.videoHeight;
                 context.drawImage(videoRef.current, 0, 0, canvasRef.current.width, canvasRef.current.height);
 
-                const frame = canvasRef.current.toDataURL('image/jpeg', 0.8).split(',')[1];
+                const canvas = canvasRef.current;
+                const frame = await new Promise<Blob | null>((resolve) => canvas.toBlob(resolve, 'image/jpeg', 0.8));
+                const params = new URLSearchParams({ exercise_type: currentExercise, session_id: sessionIdRef.current, ack: 'none' });
+                let retryAfterMs = 0;
                 try {
-                    const response = await fetch('http://localhost:3001/process_frame', {
+                    const response = await fetch(`http://localhost:3001/process_frame?${params}`, {
                         method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ frame, exercise_type: currentExercise })
+                        headers: { 'Content-Type': 'image/jpeg' },
+                        body: frame
                     });
 
-                    const data = await response.json();
-                    if (data.reps > 0) {
-                        setRepCounter(data.reps);
+                    if (response.status === 429) {
+                        // Over the per-session rate: a token is back within a frame interval,
+                        // so a whole-second Retry-After would only miss reps
+                        retryAfterMs = 2 * FRAME_INTERVAL_MS;
+                    } else if (response.status === 503) {
+                        // The server is shedding load; back off instead of retrying at frame rate
+                        retryAfterMs = (Number(response.headers.get('Retry-After')) || 1) * 1000;
                     }
                 } catch (error) {
                     console.error('Error processing frame:', error);
                 }
 
-                requestAnimationFrame(processFrame);
+                if (retryAfterMs) {
+                    setTimeout(() => requestAnimationFrame(processFrame), retryAfterMs);
+                } else {
+                    requestAnimationFrame(processFrame);
+                }
             }
         };
 
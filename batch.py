@@ -0,0 +1,210 @@
+"""Re-score recorded workout videos offline.
+
+Every video under the given paths runs through the same steps as a frame
+uploaded to the pose server (colour conversion, MediaPipe Pose, joint
+angles, One Euro smoothing, the exercise state machine) with a fresh
+exercise state, filter and Pose graph. Videos are spread across a pool of worker processes,
+each holding one graph. One JSON file per video is written to --out with
+the rep count and a timeline of stage changes. With --cache the raw
+landmarks are also saved per video, so replay.py can re-count reps without
+inference.
+
+Usage: python batch.py --exercise Squats --out results/ videos/
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from angles import joint_angles
+from exercises import EXERCISES
+from landmark_cache import EXTENSION as CACHE_EXTENSION, LandmarkCacheWriter
+from landmarks import landmarks_to_array
+from sessions import ExerciseState
+from smoothing import OneEuroFilter
+
+logger = logging.getLogger(__name__)
+
+POSE_OPTIONS = {'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5}
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v')
+
+# One Pose graph per worker process, created by the pool initializer
+_pose = None
+
+
+def _init_worker(pose_options):
+    global _pose
+    import mediapipe as mp
+
+    # Each worker is one core's worth of inference
+    cv2.setNumThreads(1)
+    _pose = mp.solutions.pose.Pose(**pose_options)
+
+
+def find_videos(paths):
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                videos.extend(os.path.join(root, name) for name in files
+                              if name.lower().endswith(VIDEO_EXTENSIONS))
+        else:
+            videos.append(path)
+    return sorted(videos)
+
+
+def score_video(path, exercise_type, max_height=None, cache_path=None, smoothing=None):
+    """Count reps in one video and return its result dict; smoothing is OneEuroFilter options or None"""
+    exercise = EXERCISES[exercise_type]
+    state = ExerciseState()
+    smoother = OneEuroFilter(**smoothing) if smoothing is not None else None
+    _pose.reset()
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return {'video': path, 'exercise_type': exercise_type, 'error': 'Could not open video'}
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cache = None
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        cache = LandmarkCacheWriter(cache_path, fps)
+
+    timeline = []
+    stage_index = state.stage_index
+    frames = 0
+    detected = 0
+    start = time.process_time()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if max_height and frame.shape[0] > max_height:
+            scale = max_height / frame.shape[0]
+            frame = cv2.resize(frame, (int(frame.shape[1] * scale), max_height), interpolation=cv2.INTER_AREA)
+        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image.flags.writeable = False
+        results = _pose.process(image)
+        frames += 1
+        landmarks = landmarks_to_array(results.pose_landmarks) if results.pose_landmarks else None
+        if cache is not None:
+            cache.append((frames - 1) / fps, landmarks)
+        if landmarks is None:
+            continue
+        detected += 1
+        if smoother is not None:
+            landmarks = smoother.filter(landmarks, (frames - 1) / fps)
+        exercise.update(state, landmarks, joint_angles(landmarks))
+        if state.stage_index != stage_index:
+            stage_index = state.stage_index
+            timeline.append({
+                'frame': frames - 1,
+                'time': round((frames - 1) / fps, 3),
+                'stage': exercise.stage_name(state),
+                'reps': state.reps
+            })
+    cpu_seconds = time.process_time() - start
+    cap.release()
+    if cache is not None:
+        cache.close()
+
+    return {
+        'video': path,
+        'exercise_type': exercise_type,
+        'reps': state.reps,
+        'frames': frames,
+        'detected_frames': detected,
+        'fps': fps,
+        'cpu_seconds': round(cpu_seconds, 3),
+        'timeline': timeline
+    }
+
+
+def add_smoothing_arguments(parser):
+    """Smoothing flags shared with replay.py; defaults match the server's"""
+    parser.add_argument('--smoothing', default='one_euro', choices=('one_euro', 'off'))
+    parser.add_argument('--min-cutoff', type=float, default=1.0, help='One Euro minimum cutoff in Hz')
+    parser.add_argument('--beta', type=float, default=10.0, help='One Euro speed coefficient')
+
+
+def smoothing_options(args):
+    if args.smoothing == 'off':
+        return None
+    return {'min_cutoff': args.min_cutoff, 'beta': args.beta}
+
+
+def output_path(out_dir, video, root, extension='.json'):
+    relative = os.path.relpath(video, root) if root else os.path.basename(video)
+    return os.path.join(out_dir, relative + extension)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='video files or directories to search')
+    parser.add_argument('--exercise', required=True, choices=sorted(EXERCISES))
+    parser.add_argument('--out', required=True, help='directory for per-video JSON results')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-height', type=int, help='downscale taller frames before inference')
+    parser.add_argument('--cache', help='directory to save per-video landmark caches in')
+    parser.add_argument('--skip-existing', action='store_true', help='leave videos with a result file alone')
+    add_smoothing_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    # Results mirror the directory layout so equal file names do not collide
+    root = args.paths[0] if len(args.paths) == 1 and os.path.isdir(args.paths[0]) else None
+    jobs = {}
+    for video in find_videos(args.paths):
+        out = output_path(args.out, video, root)
+        if args.skip_existing and os.path.exists(out):
+            continue
+        jobs[video] = out
+    if not jobs:
+        sys.exit("No videos to process")
+    workers = max(1, min(args.workers, len(jobs)))
+    logger.info(f"Scoring {len(jobs)} videos on {workers} workers")
+
+    frames = 0
+    cpu_seconds = 0.0
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(POSE_OPTIONS,)) as executor:
+        futures = {
+            executor.submit(score_video, video, args.exercise, args.max_height,
+                            output_path(args.cache, video, root, CACHE_EXTENSION) if args.cache else None,
+                            smoothing_options(args)): video
+            for video in jobs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            video = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'video': video, 'exercise_type': args.exercise, 'error': str(e)}
+            if 'error' in result:
+                failed += 1
+                logger.warning(f"[{done}/{len(jobs)}] {video}: {result['error']}")
+            else:
+                frames += result['frames']
+                cpu_seconds += result['cpu_seconds']
+                logger.info(f"[{done}/{len(jobs)}] {video}: {result['reps']} reps, {result['frames']} frames")
+            out = jobs[video]
+            os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+            with open(out, 'w') as f:
+                json.dump(result, f)
+    elapsed = time.perf_counter() - start
+
+    logger.info(f"{len(jobs) - failed} videos, {frames} frames in {elapsed:.1f}s ({failed} failed)")
+    logger.info(f"Throughput: {frames / elapsed:.1f} frames/s overall, "
+                f"{frames / elapsed / workers:.1f} frames/s per core, "
+                f"{frames / cpu_seconds if cpu_seconds else 0.0:.1f} frames per CPU second")
+
+
+if __name__ == '__main__':
+    main()
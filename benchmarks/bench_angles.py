@@ -0,0 +1,51 @@
+"""Joint-angle cost: per-call calculate_angle vs the batched joint_angles kernel.
+
+Usage: python benchmarks/bench_angles.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from angles import JOINTS, calculate_angle, joint_angles
+
+
+def per_call_all_joints(landmarks):
+    # What process_frame used to do: build point lists and call once per joint
+    return [
+        calculate_angle([landmarks[a, 0], landmarks[a, 1]],
+                        [landmarks[b, 0], landmarks[b, 1]],
+                        [landmarks[c, 0] + offset[0], landmarks[c, 1] + offset[1]])
+        for a, b, c, offset in JOINTS.values()
+    ]
+
+
+def per_call_one_joint(landmarks):
+    a, b, c, _ = JOINTS['left_knee']
+    return calculate_angle([landmarks[a, 0], landmarks[a, 1]],
+                           [landmarks[b, 0], landmarks[b, 1]],
+                           [landmarks[c, 0], landmarks[c, 1]])
+
+
+def report(label, fn, number, frames_per_call=1):
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"{label:<40} {seconds * 1e6:>10.2f} us/call {seconds * 1e6 / frames_per_call:>10.3f} us/frame")
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame = rng.random((33, 4), dtype=np.float32)
+    batch = rng.random((100000, 33, 4), dtype=np.float32)
+
+    print(f"{len(JOINTS)} joints per frame")
+    report('calculate_angle, one joint', lambda: per_call_one_joint(frame), 20000)
+    report(f'calculate_angle, {len(JOINTS)} joints', lambda: per_call_all_joints(frame), 2000)
+    report(f'joint_angles, {len(JOINTS)} joints', lambda: joint_angles(frame), 20000)
+    report(f'joint_angles, batch of {len(batch)}', lambda: joint_angles(batch), 5, len(batch))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Frames/sec and latency of the multi-process pose backend with micro-batching.
+
+Many client threads, each with its own session, send frames back to back to
+a ProcessPoseBackend. Each batch wait setting gets a fresh backend; 0 sends
+every frame on its own, as without batching. Reports aggregate frames/sec,
+per-frame latency and the average batch size actually formed.
+
+Usage: python benchmarks/bench_batching.py [--workers 1] [--clients 16] [--waits 0 2 5 10]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import synthetic_person
+from inference_workers import ProcessPoseBackend
+from sessions import Session
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(backend, frame, clients, seconds):
+    latencies = [[] for _ in range(clients)]
+    deadline = time.perf_counter() + seconds
+
+    def client(index):
+        session = Session(f"bench-{index}")
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            backend.detect(session, frame)
+            latencies[index].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [latency for client in latencies for latency in client]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--image', help='frame to send; defaults to a synthetic figure')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--max-batch', type=int, default=8)
+    parser.add_argument('--waits', type=float, nargs='+', default=[0, 2, 5, 10], help='batch waits in ms')
+    args = parser.parse_args()
+
+    frame = cv2.imread(args.image) if args.image else synthetic_person()
+    print(f"{os.cpu_count()} cores, {args.workers} workers, {args.clients} clients, "
+          f"frame {frame.shape[1]}x{frame.shape[0]}")
+    print(f"{'wait ms':>7} {'fps':>7} {'p50 ms':>8} {'p95 ms':>8} {'batch avg':>10}")
+    for wait in args.waits:
+        backend = ProcessPoseBackend(args.workers, max_width=frame.shape[1], max_height=frame.shape[0], timeout=60,
+                                     max_batch=args.max_batch, batch_wait=wait / 1000)
+        try:
+            backend.warm_up([frame, frame])
+            latencies = run(backend, frame, args.clients, args.seconds)
+            batching = backend.stats()['batching']
+        finally:
+            backend.close()
+        print(f"{wait:>7.1f} {len(latencies) / args.seconds:>7.1f} {statistics.median(latencies) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.95) * 1000:>8.1f} {batching['batch_avg'] if batching else 1.0:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Memory behaviour of the upload frame path with and without pooled buffers.
+
+Runs the request-side frame path: read the JPEG body, decode it, and convert
+it to RGB for inference. It runs once allocating fresh buffers as before,
+and once reading bodies into a BufferPool and converting into pooled RGB
+buffers. Frames alternate between two resolutions, as sessions decoded at
+different scales do.
+
+Each mode runs in its own process. Reports time per frame, minor page
+faults per frame, RSS growth, and tracemalloc's peak and the size of
+allocations still live at the end. cv2.imdecode cannot decode into a given
+buffer from Python, so the decoded BGR frame is allocated in both modes.
+
+Usage: python benchmarks/bench_buffers.py [--frames 100000]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from buffers import BufferPool, read_into
+from frames import decode_image, synthetic_person
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def frame_path(bodies, frames, pooled):
+    body_pool = BufferPool(per_key=8)
+    rgb_pool = BufferPool()
+    for i in range(frames):
+        body = bodies[i % len(bodies)]
+        stream = io.BytesIO(body)
+        if pooled:
+            buffer, data = read_into(stream, len(body), body_pool)
+            frame = decode_image(data)
+            rgb = rgb_pool.acquire(frame.shape)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            rgb_pool.release(rgb)
+            body_pool.release(buffer)
+        else:
+            data = stream.read(len(body))
+            frame = decode_image(data)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return body_pool, rgb_pool
+
+
+def child(mode, frames):
+    bodies = [cv2.imencode('.jpg', synthetic_person(width, height))[1].tobytes()
+              for width, height in ((640, 480), (320, 240))]
+    pooled = mode == 'pooled'
+    # Fill the pools and let the allocator settle before measuring
+    frame_path(bodies, 100, pooled)
+
+    rss = rss_bytes()
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+    start = time.perf_counter()
+    frame_path(bodies, frames, pooled)
+    seconds = time.perf_counter() - start
+    result = {
+        'seconds': seconds / frames,
+        'faults': (resource.getrusage(resource.RUSAGE_SELF).ru_minflt - faults) / frames,
+        'rss_growth': rss_bytes() - rss
+    }
+
+    tracemalloc.start()
+    frame_path(bodies, min(frames, 2000), pooled)
+    result['traced_live'], result['traced_peak'] = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=100000)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.frames)
+        return
+
+    print(f"{args.frames} frames, 640x480 and 320x240 alternating")
+    print(f"{'mode':<7} {'us/frame':>9} {'faults/frame':>13} {'RSS growth MB':>14} {'traced peak KB':>15} "
+          f"{'traced live KB':>15}")
+    for mode in ('fresh', 'pooled'):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, '--frames', str(args.frames)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output)
+        print(f"{mode:<7} {result['seconds'] * 1e6:>9.0f} {result['faults']:>13.1f} "
+              f"{result['rss_growth'] / 1e6:>14.1f} {result['traced_peak'] / 1e3:>15.0f} {result['traced_live'] / 1e3:>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Bytes and CPU per frame: JSON frame responses vs 204 plus server-sent events.
+
+A trivial Flask route returns the result the way /process_frame does, either
+as a JSON body or, with ack=none, as an empty 204. With events the rep and
+stage changes are sent once over /events/<session_id>; their cost is spread
+over the frames, at one stage change every `--frames-per-change` frames (a
+rep every two). Server CPU covers building and writing the response through
+WSGI; client CPU is parsing the status line, headers and JSON, as a browser
+fetch() would, plus the events it receives.
+
+Usage: python benchmarks/bench_events.py [--frames 20000] [--frames-per-change 30]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+from flask import Flask, jsonify, request
+from werkzeug.test import EnvironBuilder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import format_event
+
+RESULT = {'reps': 12, 'stage': 'down'}
+
+
+def frame_app():
+    app = Flask('frames')
+
+    @app.route('/process_frame', methods=['POST'])
+    def process_frame():
+        if request.args.get('ack') == 'none':
+            return '', 204
+        return jsonify(RESULT)
+
+    return app
+
+
+def http_response(status, headers, body):
+    """Serialise a response the way the server writes it to the socket"""
+    lines = [f"HTTP/1.1 {status}"] + [f"{name}: {value}" for name, value in headers]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + body
+
+
+def parse_response(raw):
+    """What the client does per response: status, headers and a JSON body if any"""
+    head, _, body = raw.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = dict(line.split(': ', 1) for line in lines[1:])
+    if body and headers.get('Content-Type') == 'application/json':
+        return status, json.loads(body)
+    return status, None
+
+
+def serve(app, ack, frames):
+    """Server seconds and the raw responses for frames uploads"""
+    environ = EnvironBuilder(path='/process_frame', method='POST',
+                             query_string={'exercise_type': 'Squats', 'session_id': 'bench', 'ack': ack}).get_environ()
+    responses = []
+    start = time.process_time()
+    for _ in range(frames):
+        env = dict(environ)
+        env['wsgi.input'] = io.BytesIO()
+        captured = []
+        body = b''.join(app(env, lambda status, headers: captured.append((status, headers))))
+        status, headers = captured[0]
+        responses.append(http_response(status, headers, body))
+    return time.process_time() - start, responses
+
+
+def stream_events(changes):
+    """Server seconds and the encoded events for changes stage changes"""
+    messages = []
+    start = time.process_time()
+    for i in range(changes):
+        kind = 'rep' if i % 2 else 'stage'
+        messages.append(format_event(i + 1, kind, {'exercise_type': 'Squats', 'reps': i // 2,
+                                                   'stage': 'up' if i % 2 else 'down'}).encode())
+    return time.process_time() - start, messages
+
+
+def parse_events(messages):
+    start = time.process_time()
+    for message in messages:
+        fields = dict(line.split(': ', 1) for line in message.decode().splitlines() if line)
+        json.loads(fields['data'])
+    return time.process_time() - start
+
+
+def client_seconds(responses):
+    start = time.process_time()
+    for raw in responses:
+        parse_response(raw)
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('--frames-per-change', type=int, default=30)
+    args = parser.parse_args()
+
+    app = frame_app()
+    frames = args.frames
+    changes = frames // args.frames_per_change
+
+    server, responses = serve(app, 'full', frames)
+    polled = (sum(map(len, responses)), server, client_seconds(responses))
+
+    server, responses = serve(app, 'none', frames)
+    event_server, messages = stream_events(changes)
+    pushed = (sum(map(len, responses)) + sum(map(len, messages)), server + event_server,
+              client_seconds(responses) + parse_events(messages))
+
+    print(f"{frames} frames, {changes} stage changes")
+    print(f"{'mode':<16} {'bytes/frame':>12} {'server us/frame':>16} {'client us/frame':>16}")
+    for label, (size, server, client) in (('json responses', polled), ('204 + events', pushed)):
+        print(f"{label:<16} {size / frames:>12.1f} {server / frames * 1e6:>16.2f} {client / frames * 1e6:>16.2f}")
+    print(f"saved            {(polled[0] - pushed[0]) / frames:>12.1f} {(polled[1] - pushed[1]) / frames * 1e6:>16.2f} "
+          f"{(polled[2] - pushed[2]) / frames * 1e6:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
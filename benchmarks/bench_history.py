@@ -0,0 +1,80 @@
+"""Append and window cost, and memory over a long session, of LandmarkHistory.
+
+Appends frames of landmarks, joint angles and timestamps the way
+process_frame does, to LandmarkHistory and to a bounded deque of per-frame
+copies, then reads the newest window from each: a view for the ring buffer,
+a stacked array for the deque. Memory is traced over --frames appends; a
+plain list that keeps every frame is shown for comparison.
+
+Usage: python benchmarks/bench_history.py [--capacity 64] [--window 30] [--frames 100000]
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from angles import joint_angles
+from history import LandmarkHistory
+from landmarks import NUM_LANDMARKS
+
+
+class DequeHistory:
+    def __init__(self, capacity):
+        self.frames = deque(maxlen=capacity)
+
+    def append(self, landmarks, angles, timestamp):
+        self.frames.append((landmarks.copy(), angles.copy(), timestamp))
+
+    def window(self, frames):
+        recent = list(self.frames)[-frames:]
+        return (np.stack([frame[0] for frame in recent]), np.stack([frame[1] for frame in recent]),
+                np.array([frame[2] for frame in recent]))
+
+
+class ListHistory(DequeHistory):
+    def __init__(self, capacity):
+        self.frames = []
+
+
+def traced_memory(cls, capacity, landmarks, angles, frames):
+    tracemalloc.start()
+    history = cls(capacity)
+    for i in range(frames):
+        history.append(landmarks, angles, i / 30)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--capacity', type=int, default=64)
+    parser.add_argument('--window', type=int, default=30)
+    parser.add_argument('--frames', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    landmarks = rng.uniform(0, 1, (NUM_LANDMARKS, 4)).astype(np.float32)
+    angles = joint_angles(landmarks)
+    print(f"capacity {args.capacity}, window {args.window} frames")
+    print(f"{'history':<16} {'append us':>10} {'window us':>10} {'memory after %d frames KB' % args.frames:>32}")
+    for name, cls in (('LandmarkHistory', LandmarkHistory), ('deque', DequeHistory), ('list', ListHistory)):
+        history = cls(args.capacity)
+        clock = iter(range(10 ** 7))
+        append = min(timeit.repeat(lambda: history.append(landmarks, angles, next(clock) / 30),
+                                   number=10000, repeat=3)) / 10000
+        window = min(timeit.repeat(lambda: history.window(args.window), number=10000, repeat=3)) / 10000
+        if cls is LandmarkHistory:
+            assert np.shares_memory(history.window(args.window)[0], history.landmarks)
+        memory = traced_memory(cls, args.capacity, landmarks, angles, args.frames)
+        print(f"{name:<16} {append * 1e6:>10.2f} {window * 1e6:>10.2f} {memory / 1e3:>32.0f}")
+
+
+if __name__ == '__main__':
+    main()
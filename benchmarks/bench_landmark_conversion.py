@@ -0,0 +1,60 @@
+"""Cost of copying MediaPipe pose landmarks into the (33, 4) float32 array.
+
+Compares reading x, y, z and visibility attribute by attribute with
+landmarks_to_array, which unpacks the serialized landmark list in one call,
+and checks that both give the same array. Uses the pose detected in --image,
+or a synthetic landmark list.
+
+Usage: python benchmarks/bench_landmark_conversion.py [--image person.jpg]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from landmarks import NUM_LANDMARKS, landmarks_to_array
+
+
+def attribute_access(pose_landmarks):
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark], dtype=np.float32)
+
+
+def detected_landmarks(path):
+    import cv2
+    import mediapipe as mp
+    with mp.solutions.pose.Pose(static_image_mode=True) as pose:
+        return pose.process(cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)).pose_landmarks
+
+
+def synthetic_landmarks(rng):
+    pose_landmarks = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility in rng.uniform(0, 1, (NUM_LANDMARKS, 4)):
+        pose_landmarks.landmark.add(x=x, y=y, z=z - 0.5, visibility=visibility)
+    return pose_landmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--image', help='image with a person in it; synthetic landmarks when omitted')
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    pose_landmarks = detected_landmarks(args.image) if args.image else synthetic_landmarks(np.random.default_rng(0))
+    if pose_landmarks is None:
+        sys.exit(f"no pose found in {args.image}")
+    print(f"identical: {np.array_equal(attribute_access(pose_landmarks), landmarks_to_array(pose_landmarks))}")
+    out = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    for name, convert in (('attribute access', lambda: attribute_access(pose_landmarks)),
+                          ('landmarks_to_array', lambda: landmarks_to_array(pose_landmarks)),
+                          ('landmarks_to_array(out=)', lambda: landmarks_to_array(pose_landmarks, out))):
+        seconds = min(timeit.repeat(convert, number=args.number, repeat=3)) / args.number
+        print(f"{name:<25} {seconds * 1e6:>6.1f} us per frame")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Throughput of /landmarks, which counts reps from client-detected landmarks.
+
+Requests go straight through the app's WSGI interface, one session per
+request in round-robin, with float16 batches of recorded-looking squats
+(a knee bending between 90 and 170 degrees). Rate limiting is off and no
+pose graph is built. Reports frames and requests per CPU second for each
+batch size, with and without an events subscriber on every session.
+
+Usage: python benchmarks/bench_landmarks.py [--sessions 100] [--frames 200000]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from werkzeug.test import EnvironBuilder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('FLASK_RATELIMIT_ENABLED', 'false')
+# Import MediaPipe but build nothing: /landmarks never runs inference
+os.environ.setdefault('POSE_STARTUP', 'preload')
+
+import main as server
+from events import EventChannel
+from landmarks import LEFT_ANKLE, LEFT_HIP, LEFT_KNEE, NUM_LANDMARKS
+
+
+def squat_frames(count, fps=30.0, rep_seconds=2.0):
+    """(count, 33, 4) float16 frames of a squatting left leg"""
+    t = np.arange(count) / fps
+    knee = np.radians(130 + 40 * np.cos(2 * np.pi * t / rep_seconds))
+    frames = np.zeros((count, NUM_LANDMARKS, 4), dtype=np.float16)
+    frames[:, :, 3] = 1
+    frames[:, LEFT_KNEE, :2] = (0.5, 0.7)
+    frames[:, LEFT_ANKLE, :2] = (0.5, 0.9)
+    # The hip swings around the knee; the angle at the knee is measured from the ankle
+    frames[:, LEFT_HIP, 0] = 0.5 + 0.2 * np.sin(np.pi - knee)
+    frames[:, LEFT_HIP, 1] = 0.7 - 0.2 * np.cos(np.pi - knee)
+    return frames
+
+
+def run(environs, bodies, requests):
+    statuses = {}
+
+    def start_response(status, headers):
+        statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.process_time()
+    for i in range(requests):
+        environ = dict(environs[i % len(environs)])
+        body = bodies[i % len(bodies)]
+        environ['wsgi.input'] = io.BytesIO(body)
+        environ['CONTENT_LENGTH'] = str(len(body))
+        for chunk in server.app(environ, start_response):
+            pass
+    return time.process_time() - start, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--frames', type=int, default=200000, help='frames sent per batch size')
+    args = parser.parse_args()
+
+    frames = squat_frames(3000)
+    print(f"{'batch':>6} {'events':>7} {'requests/s':>11} {'frames/s':>11} {'us/frame':>9}")
+    for batch in (1, 8, 64, 512):
+        bodies = [frames[i:i + batch].tobytes() for i in range(0, len(frames) - batch + 1, batch)]
+        requests = max(args.frames // batch, 200)
+        for subscribed in (False, True):
+            environs = []
+            for i in range(args.sessions):
+                session_id = f'bench-{batch}-{subscribed}-{i}'
+                if subscribed:
+                    server.sessions.get(session_id).events = EventChannel()
+                environs.append(EnvironBuilder(
+                    path='/landmarks', method='POST', content_type='application/octet-stream',
+                    query_string={'exercise_type': 'Squats', 'session_id': session_id, 'ack': 'none'}
+                ).get_environ())
+            seconds, statuses = run(environs, bodies, requests)
+            if set(statuses) != {'204 NO CONTENT'}:
+                raise RuntimeError(f"unexpected responses: {statuses}")
+            print(f"{batch:>6} {'yes' if subscribed else 'no':>7} {requests / seconds:>11.0f} "
+                  f"{requests * batch / seconds:>11.0f} {seconds / (requests * batch) * 1e6:>9.2f}")
+
+    reps = server.sessions.get('bench-512-False-0').state('Squats').reps
+    print(f"reps counted by one session: {reps}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Per-frame cost of the /metrics instrumentation.
+
+Replays the instrumentation one frame performs (six stage timings, the frame
+counter and the in-flight gauge) against an empty frame body, and reports the
+difference in microseconds per frame.
+
+Usage: python benchmarks/bench_metrics.py
+"""
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import (
+    BASE64_SECONDS, COLOR_SECONDS, ENCODE_SECONDS, FRAMES, IMDECODE_SECONDS,
+    IN_FLIGHT, INFERENCE_SECONDS, RULES_SECONDS, registry
+)
+
+STAGES = (BASE64_SECONDS, IMDECODE_SECONDS, COLOR_SECONDS, INFERENCE_SECONDS, RULES_SECONDS, ENCODE_SECONDS)
+NUMBER = 100000
+
+
+def bare_frame():
+    for _ in STAGES:
+        pass
+
+
+def instrumented_frame():
+    FRAMES.inc()
+    IN_FLIGHT.inc()
+    IN_FLIGHT.dec()
+    for stage in STAGES:
+        start = time.perf_counter()
+        stage.observe(time.perf_counter() - start)
+
+
+def main():
+    bare = min(timeit.repeat(bare_frame, number=NUMBER, repeat=5)) / NUMBER
+    instrumented = min(timeit.repeat(instrumented_frame, number=NUMBER, repeat=5)) / NUMBER
+    observe = min(timeit.repeat(lambda: RULES_SECONDS.observe(0.001), number=NUMBER, repeat=5)) / NUMBER
+    render = min(timeit.repeat(registry.render, number=1000, repeat=5)) / 1000
+
+    print(f"histogram observe      {observe * 1e6:8.3f} us")
+    print(f"overhead per frame     {(instrumented - bare) * 1e6:8.3f} us")
+    print(f"/metrics render        {render * 1e6:8.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Per-request cost of rate limiting a frame route: flask-limiter vs token buckets.
+
+Three copies of a trivial Flask route are driven straight through WSGI by
+1000 concurrent sessions, each from its own address, in round-robin. Every
+route reads the session id, as the real one does. The routes use no
+limiter, flask-limiter with the old frame limits, and the per-session plus
+per-address token buckets from ratelimit.py. Overhead is the difference to
+the unlimited route. flask-limiter must be installed for its row.
+
+Usage: python benchmarks/bench_ratelimit.py [--sessions 1000] [--requests 50000]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import timeit
+
+from flask import Flask, request
+from werkzeug.test import EnvironBuilder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import TokenBucketLimiter
+
+
+def plain_app():
+    app = Flask('plain')
+
+    @app.route('/process_frame', methods=['POST'])
+    def process_frame():
+        return request.args['session_id'][:0]
+
+    return app
+
+
+def flask_limiter_app():
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+
+    app = Flask('flask_limiter')
+    limiter = Limiter(get_remote_address, app=app, default_limits=["200 per day", "50 per hour"],
+                      storage_uri="memory://")
+
+    @app.route('/process_frame', methods=['POST'])
+    @limiter.limit("10 per second")
+    def process_frame():
+        return request.args['session_id'][:0]
+
+    return app
+
+
+def token_bucket_app():
+    app = Flask('token_bucket')
+    sessions = TokenBucketLimiter(30, burst=30)
+    addresses = TokenBucketLimiter(120, burst=120)
+
+    @app.route('/process_frame', methods=['POST'])
+    def process_frame():
+        if addresses.hit(request.remote_addr) or sessions.hit(request.args['session_id']):
+            return '', 429
+        return ''
+
+    return app
+
+
+def run(app, environs, requests):
+    statuses = {}
+
+    def start_response(status, headers):
+        statuses[status] = statuses.get(status, 0) + 1
+
+    count = len(environs)
+    start = time.perf_counter()
+    for i in range(requests):
+        environ = dict(environs[i % count])
+        environ['wsgi.input'] = io.BytesIO()
+        for chunk in app(environ, start_response):
+            pass
+    return (time.perf_counter() - start) / requests, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=50000)
+    args = parser.parse_args()
+
+    environs = []
+    for i in range(args.sessions):
+        environ = EnvironBuilder(path='/process_frame', method='POST', query_string={'session_id': f'session-{i}'},
+                                 environ_base={'REMOTE_ADDR': f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'}).get_environ()
+        environs.append(environ)
+
+    apps = [('no limiter', plain_app)]
+    try:
+        import flask_limiter  # noqa: F401
+        apps.append(('flask-limiter', flask_limiter_app))
+    except ImportError:
+        print("flask-limiter not installed, skipping it")
+    apps.append(('token buckets', token_bucket_app))
+
+    print(f"{args.sessions} sessions, {args.requests} requests")
+    print(f"{'limiter':<14} {'us/request':>11} {'overhead us':>12}  responses")
+    baseline = None
+    for label, factory in apps:
+        seconds, statuses = run(factory(), environs, args.requests)
+        baseline = seconds if baseline is None else baseline
+        print(f"{label:<14} {seconds * 1e6:>11.1f} {(seconds - baseline) * 1e6:>12.1f}  {statuses}")
+
+    limiter = TokenBucketLimiter(30, burst=30)
+    keys = [f'session-{i}' for i in range(args.sessions)]
+    seconds = min(timeit.repeat(lambda: [limiter.hit(key) for key in keys], number=20, repeat=5)) / (20 * len(keys))
+    print(f"TokenBucketLimiter.hit alone: {seconds * 1e9:.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
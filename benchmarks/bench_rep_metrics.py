@@ -0,0 +1,89 @@
+"""Per-frame cost of keeping per-rep metrics in the rep state machine.
+
+Runs synthetic squat workouts (see bench_smoothing.py) through
+Exercise.update() without timestamps, which only counts reps, and with
+them, which also keeps RepMetrics. Reports the time per frame of each, the
+difference, and the rep records next to the workouts' true rep counts. The
+signal and joint angles are computed beforehand, so only the state machine
+is timed.
+
+Usage: python benchmarks/bench_rep_metrics.py [--exercise Squats] [--workouts 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from angles import joint_angles
+from bench_smoothing import synthetic_workout
+from exercises import EXERCISES
+from sessions import ExerciseState
+from smoothing import OneEuroFilter
+
+
+def run(exercise, frames, timed):
+    state = ExerciseState()
+    records = []
+    update = exercise.update
+    start = time.perf_counter()
+    if timed:
+        for landmarks, angles, timestamp in frames:
+            update(state, landmarks, angles, timestamp)
+            if state.metrics.closed is not None:
+                records.append(state.metrics.closed)
+    else:
+        for landmarks, angles, _ in frames:
+            update(state, landmarks, angles)
+    return time.perf_counter() - start, state.reps, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--exercise', default='Squats', choices=sorted(EXERCISES))
+    parser.add_argument('--workouts', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    exercise = EXERCISES[args.exercise]
+    rng = np.random.default_rng(args.seed)
+    workouts = []
+    for _ in range(args.workouts):
+        landmarks, timestamps, reps = synthetic_workout(rng, 30.0, 0.012, 0.02)
+        smoother = OneEuroFilter()
+        frames = []
+        for frame, timestamp in zip(landmarks, timestamps.tolist()):
+            frame = smoother.filter(frame, timestamp)
+            frames.append((frame, joint_angles(frame), timestamp))
+        workouts.append((frames, reps))
+    count = sum(len(frames) for frames, _ in workouts)
+
+    seconds = {}
+    for timed in (False, True):
+        seconds[timed] = min(sum(run(exercise, frames, timed)[0] for frames, _ in workouts)
+                             for _ in range(args.repeat)) / count
+    print(f"{args.workouts} workouts, {count} frames")
+    print(f"update() counting only:     {seconds[False] * 1e6:.2f} us per frame")
+    print(f"update() with rep metrics:  {seconds[True] * 1e6:.2f} us per frame")
+    print(f"added by rep metrics:       {(seconds[True] - seconds[False]) * 1e6:.2f} us per frame")
+
+    truth = counted = 0
+    records = []
+    for frames, reps in workouts:
+        _, state_reps, workout_records = run(exercise, frames, True)
+        truth += reps
+        counted += state_reps
+        records.extend(workout_records)
+    print(f"reps: {truth} true, {counted} counted, {len(records)} records")
+    if records:
+        for key in ('concentric', 'eccentric', 'hold', 'time_under_tension', 'min', 'max', 'peak_velocity'):
+            values = [record[key] for record in records]
+            print(f"  {key:<19} mean {np.mean(values):>8.2f}  range {min(values):.2f} - {max(values):.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Replay throughput from a memory-mapped landmark cache vs frame-by-frame update().
+
+Builds a synthetic recording whose landmarks swing every exercise's signal
+through both thresholds, with some frames missing a pose, checks that the
+vectorised replay matches update() frame by frame, and times both.
+
+Usage: python benchmarks/bench_replay.py --frames 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from angles import joint_angles
+from exercises import EXERCISES
+from landmark_cache import LandmarkCache, LandmarkCacheWriter
+from sessions import ExerciseState
+
+
+def synthetic_landmarks(frames, seed=0):
+    rng = np.random.default_rng(seed)
+    landmarks = rng.random((frames, 33, 4), dtype=np.float32)
+    # Slow random walks give runs of frames in each zone, like real reps
+    walk = np.cumsum(rng.normal(0, 0.05, (frames, 33, 2)), axis=0, dtype=np.float32)
+    landmarks[:, :, :2] = 0.5 + 0.4 * np.sin(walk)
+    landmarks[rng.random(frames) < 0.05] = np.nan
+    return landmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=1000000)
+    parser.add_argument('--check-frames', type=int, default=20000, help='frames compared against update()')
+    args = parser.parse_args()
+
+    landmarks = synthetic_landmarks(args.frames)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic.lmk')
+        start = time.perf_counter()
+        with LandmarkCacheWriter(path, 30.0) as writer:
+            for i, frame in enumerate(landmarks):
+                writer.append(i / 30.0, None if np.isnan(frame[0, 0]) else frame)
+        print(f"wrote {args.frames} frames in {time.perf_counter() - start:.2f}s "
+              f"({os.path.getsize(path) / 2 ** 20:.0f} MiB)")
+
+        cache = LandmarkCache(path)
+        for name, exercise in EXERCISES.items():
+            start = time.perf_counter()
+            stages, reps = exercise.replay(cache.landmarks)
+            replay_seconds = time.perf_counter() - start
+
+            state = ExerciseState()
+            check = cache.landmarks[:args.check_frames]
+            start = time.perf_counter()
+            for i, frame in enumerate(check):
+                if not np.isnan(frame[0, 0]):
+                    exercise.update(state, frame, joint_angles(frame))
+                if state.stage_index != stages[i] or state.reps != reps[i]:
+                    sys.exit(f"{name}: replay diverges from update() at frame {i}")
+            update_seconds = time.perf_counter() - start
+
+            print(f"{name:<12} {int(reps[-1]):>7} reps  replay {args.frames / replay_seconds:>12,.0f} frames/s  "
+                  f"update() {len(check) / update_seconds:>9,.0f} frames/s")
+        del cache
+
+
+if __name__ == '__main__':
+    main()
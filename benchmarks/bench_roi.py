@@ -0,0 +1,106 @@
+"""Pixels, time and landmark drift of ROI cropping on recorded workouts.
+
+Each video is run through a fresh Pose graph twice: whole frames, and frames
+cropped by RoiTracker. Reports pixels per frame handed to inference, colour
+conversion plus inference time, frames cropped, detections, the mean
+distance between the two runs' confident landmarks, and rep counts.
+
+Usage: python benchmarks/bench_roi.py --exercise Squats clip1.mp4 clip2.mp4
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from angles import joint_angles
+from exercises import EXERCISES
+from landmarks import landmarks_to_array
+from roi import RoiTracker
+from sessions import ExerciseState
+
+
+def load_video(path, max_height):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if max_height and frame.shape[0] > max_height:
+            scale = max_height / frame.shape[0]
+            frame = cv2.resize(frame, (int(frame.shape[1] * scale), max_height), interpolation=cv2.INTER_AREA)
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run(frames, exercise, crop):
+    pose = mp.solutions.pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    roi = RoiTracker() if crop else None
+    state = ExerciseState()
+    results = []
+    pixels = 0
+    cropped = 0
+    seconds = 0.0
+    for frame in frames:
+        start = time.perf_counter()
+        image = roi.crop(frame) if roi else frame
+        output = pose.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        landmarks = landmarks_to_array(output.pose_landmarks) if output.pose_landmarks else None
+        if roi:
+            landmarks = roi.update(landmarks, frame.shape)
+        seconds += time.perf_counter() - start
+        pixels += image.shape[0] * image.shape[1]
+        cropped += image is not frame
+        results.append(landmarks)
+        if landmarks is not None:
+            exercise.update(state, landmarks, joint_angles(landmarks))
+    pose.close()
+    return {'pixels': pixels, 'cropped': cropped, 'seconds': seconds, 'landmarks': results, 'reps': state.reps}
+
+
+def drift(full, cropped, shape):
+    """Mean pixel distance between landmarks both runs are confident about"""
+    distances = []
+    scale = np.array([shape[1], shape[0]])
+    for a, b in zip(full, cropped):
+        if a is None or b is None:
+            continue
+        confident = (a[:, 3] >= 0.5) & (b[:, 3] >= 0.5)
+        distances.extend(np.linalg.norm((a[confident, :2] - b[confident, :2]) * scale, axis=1))
+    return float(np.mean(distances)) if distances else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('videos', nargs='+')
+    parser.add_argument('--exercise', default='Squats', choices=sorted(EXERCISES))
+    parser.add_argument('--max-height', type=int, default=480, help='downscale frames first, as uploads are')
+    args = parser.parse_args()
+
+    exercise = EXERCISES[args.exercise]
+    print(f"{'video':<20} {'mode':<5} {'kpx/frame':>10} {'ms/frame':>9} {'cropped':>8} {'detected':>9} "
+          f"{'drift px':>9} {'reps':>5}")
+    for path in args.videos:
+        frames = load_video(path, args.max_height)
+        if not frames:
+            print(f"{os.path.basename(path)}: no frames")
+            continue
+        full = run(frames, exercise, crop=False)
+        cropped = run(frames, exercise, crop=True)
+        distance = drift(full['landmarks'], cropped['landmarks'], frames[0].shape)
+        for mode, result in (('full', full), ('roi', cropped)):
+            detected = sum(landmarks is not None for landmarks in result['landmarks'])
+            print(f"{os.path.basename(path)[:20]:<20} {mode:<5} {result['pixels'] / len(frames) / 1000:>10.1f} "
+                  f"{result['seconds'] / len(frames) * 1000:>9.1f} {result['cropped'] / len(frames):>8.0%} "
+                  f"{detected / len(frames):>9.0%} {distance if mode == 'roi' else 0.0:>9.1f} {result['reps']:>5}")
+
+
+if __name__ == '__main__':
+    main()
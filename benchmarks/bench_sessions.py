@@ -0,0 +1,39 @@
+"""Per-frame session store overhead as the number of live sessions grows.
+
+Usage: python benchmarks/bench_sessions.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sessions import SessionStore
+
+FRAMES = 200000
+
+
+def bench(session_count):
+    store = SessionStore(max_sessions=session_count, ttl=3600)
+    ids = [f"session-{i}" for i in range(session_count)]
+    for session_id in ids:
+        store.get(session_id)
+
+    order = [random.choice(ids) for _ in range(FRAMES)]
+    start = time.perf_counter()
+    for session_id in order:
+        state = store.get(session_id).state('Squats')
+        state.reps += 1
+    elapsed = time.perf_counter() - start
+    return elapsed / FRAMES * 1e9
+
+
+def main():
+    print(f"{'sessions':>10} {'ns/frame':>10}")
+    for session_count in (10, 100, 1000, 10000, 50000, 100000):
+        print(f"{session_count:>10} {bench(session_count):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
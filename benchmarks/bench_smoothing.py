@@ -0,0 +1,129 @@
+"""Rep-count accuracy by frame rate, with and without One Euro landmark smoothing.
+
+By default runs on synthetic squat workouts: 8-15 reps of varying depth and
+speed, with Gaussian jitter on every landmark and occasional single-frame
+glitches where one landmark jumps, as pose models produce. Given landmark
+caches from batch.py --cache and a --labels file (cache file name -> reps),
+runs on those recordings instead. Each workout is counted at its full rate
+and at 1/2 ... 1/6 of it by keeping every Nth frame, once on raw landmarks
+and once through the filter. Also reports the filter's cost per update.
+
+Usage: python benchmarks/bench_smoothing.py [--exercise Squats] [--noise 0.012 --glitch 0.02]
+       python benchmarks/bench_smoothing.py --exercise Squats --labels labels.json caches/*.lmk
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from angles import joint_angles
+from exercises import EXERCISES
+from landmark_cache import LandmarkCache
+from landmarks import LEFT_ANKLE, LEFT_HIP, LEFT_KNEE, NUM_LANDMARKS
+from sessions import ExerciseState
+from smoothing import OneEuroFilter
+
+STRIDES = (1, 2, 3, 4, 5, 6)
+
+
+def ease(start, end, frames):
+    return start + (end - start) * (1 - np.cos(np.linspace(0, np.pi, frames))) / 2
+
+
+def synthetic_workout(rng, fps, noise, glitch):
+    """(landmarks, timestamps, reps) for a squat set, knee angle from ~165 down to 80-104 degrees"""
+    reps = int(rng.integers(8, 16))
+    knee = []
+    for _ in range(reps):
+        top = rng.uniform(160, 172)
+        bottom = rng.uniform(80, 104)
+        knee.extend([top] * int(rng.uniform(0.3, 1.0) * fps))
+        knee.extend(ease(top, bottom, int(rng.uniform(0.6, 1.2) * fps)))
+        knee.extend([bottom] * int(rng.uniform(0.0, 0.3) * fps))
+        knee.extend(ease(bottom, top, int(rng.uniform(0.6, 1.2) * fps)))
+    knee.extend([165] * int(fps))
+    theta = np.pi - np.radians(knee)
+
+    count = len(theta)
+    landmarks = np.zeros((count, NUM_LANDMARKS, 4), dtype=np.float32)
+    landmarks[:, :, :2] = rng.uniform(0.3, 0.7, (1, NUM_LANDMARKS, 2))
+    landmarks[:, :, 3] = 1
+    landmarks[:, LEFT_KNEE, :2] = (0.5, 0.7)
+    landmarks[:, LEFT_ANKLE, :2] = (0.5, 0.9)
+    landmarks[:, LEFT_HIP, 0] = 0.5 + 0.2 * np.sin(theta)
+    landmarks[:, LEFT_HIP, 1] = 0.7 - 0.2 * np.cos(theta)
+    landmarks[:, :, :3] += rng.normal(0, noise, (count, NUM_LANDMARKS, 3))
+    glitches = rng.random((count, NUM_LANDMARKS)) < glitch
+    landmarks[glitches, :2] += rng.normal(0, 0.05, (int(glitches.sum()), 2))
+    return landmarks, np.arange(count) / fps, reps
+
+
+def count_reps(exercise, landmarks, timestamps, stride, smoother):
+    state = ExerciseState()
+    for i in range(0, len(landmarks), stride):
+        frame = landmarks[i]
+        if np.isnan(frame[:, 1]).all():
+            continue
+        if smoother is not None:
+            frame = smoother.filter(frame, float(timestamps[i]))
+        exercise.update(state, frame, joint_angles(frame))
+    return state.reps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('caches', nargs='*', help='.lmk files; synthetic workouts when omitted')
+    parser.add_argument('--exercise', default='Squats', choices=sorted(EXERCISES))
+    parser.add_argument('--labels', help='JSON file mapping cache file name to true rep count')
+    parser.add_argument('--workouts', type=int, default=40, help='synthetic workouts')
+    parser.add_argument('--noise', type=float, default=0.012, help='landmark jitter, normalised units')
+    parser.add_argument('--glitch', type=float, default=0.02, help='chance a landmark jumps in a frame')
+    parser.add_argument('--min-cutoff', type=float, default=1.0)
+    parser.add_argument('--beta', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    exercise = EXERCISES[args.exercise]
+    if args.caches:
+        with open(args.labels) as f:
+            labels = json.load(f)
+        workouts = []
+        for path in args.caches:
+            cache = LandmarkCache(path)
+            workouts.append((np.asarray(cache.landmarks), np.asarray(cache.timestamps), labels[os.path.basename(path)]))
+        fps = LandmarkCache(args.caches[0]).fps
+    else:
+        fps = 30.0
+        rng = np.random.default_rng(args.seed)
+        workouts = [synthetic_workout(rng, fps, args.noise, args.glitch) for _ in range(args.workouts)]
+    truth = sum(reps for _, _, reps in workouts)
+    frames = sum(len(landmarks) for landmarks, _, _ in workouts)
+
+    print(f"{len(workouts)} workouts, {truth} reps, {frames / truth:.0f} frames per rep at {fps:.0f} fps")
+    print(f"{'fps':>5} {'frames/rep':>11} {'raw accuracy':>13} {'raw exact':>10} {'smoothed':>9} {'exact':>7}")
+    for stride in STRIDES:
+        row = []
+        for smoothed in (False, True):
+            errors = []
+            for landmarks, timestamps, reps in workouts:
+                smoother = OneEuroFilter(args.min_cutoff, args.beta) if smoothed else None
+                errors.append(abs(count_reps(exercise, landmarks, timestamps, stride, smoother) - reps))
+            row.append((1 - sum(errors) / truth, sum(error == 0 for error in errors)))
+        (raw, raw_exact), (smooth, smooth_exact) = row
+        print(f"{fps / stride:>5.1f} {frames / truth / stride:>11.1f} {raw:>13.1%} {raw_exact:>6}/{len(workouts)} "
+              f"{smooth:>9.1%} {smooth_exact:>3}/{len(workouts)}")
+
+    smoother = OneEuroFilter(args.min_cutoff, args.beta)
+    landmarks = workouts[0][0]
+    clock = iter((np.arange(10 ** 6) / fps).tolist())
+    seconds = min(timeit.repeat(lambda: smoother.filter(landmarks[0], next(clock)), number=10000, repeat=3)) / 10000
+    print(f"OneEuroFilter.filter: {seconds * 1e6:.1f} us per frame")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Bytes on the wire and server CPU per frame: base64-in-JSON vs raw JPEG.
+
+Both paths run what /process_frame does before inference: parse the body and
+decode it into a BGR frame.
+
+Usage: python benchmarks/bench_upload.py [image.jpg]
+"""
+import base64
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import decode_image
+
+ITERATIONS = 300
+RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080))
+
+
+def synthetic_frame(width, height):
+    # Smooth gradients plus blurred noise compress roughly like a webcam frame
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(noise, (0, 0), 3)
+    ramp = np.linspace(0, 120, width, dtype=np.uint8)
+    frame[:] = cv2.add(frame, ramp[None, :, None].repeat(height, 0).repeat(3, 2))
+    return frame
+
+
+def json_path(body):
+    data = json.loads(body)
+    return decode_image(base64.b64decode(data['frame']))
+
+
+def raw_path(body):
+    return decode_image(body)
+
+
+def cpu_per_frame(fn, body):
+    fn(body)
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        fn(body)
+    return (time.process_time() - start) / ITERATIONS * 1000
+
+
+def main():
+    image = cv2.imread(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    print(f"{'resolution':>10} {'path':>5} {'bytes':>9} {'cpu ms':>7}")
+    for width, height in RESOLUTIONS:
+        if image is not None:
+            frame = cv2.resize(image, (width, height))
+        else:
+            frame = synthetic_frame(width, height)
+        jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+        json_body = json.dumps({
+            'frame': base64.b64encode(jpeg).decode('ascii'),
+            'exercise_type': 'Squats',
+            'session_id': '00000000-0000-0000-0000-000000000000'
+        }).encode()
+
+        label = f"{width}x{height}"
+        print(f"{label:>10} {'json':>5} {len(json_body):>9} {cpu_per_frame(json_path, json_body):>7.3f}")
+        print(f"{label:>10} {'raw':>5} {len(jpeg):>9} {cpu_per_frame(raw_path, jpeg):>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Aggregate frames/sec of the multi-process pose backend at 1/2/4/8 workers.
+
+Each worker count is driven by twice as many client threads as workers, each
+with its own session, for a fixed duration.
+
+Usage: python benchmarks/bench_workers.py [--image person.jpg] [--seconds 10]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_upload import synthetic_frame
+from inference_workers import ProcessPoseBackend
+from sessions import Session
+
+
+def run(backend, frame, clients, seconds):
+    counts = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(index):
+        session = Session(f"bench-{index}")
+        while time.perf_counter() < deadline:
+            backend.detect(session, frame)
+            counts[index] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--image', help='frame to send; defaults to a synthetic 640x480 frame')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--start-method', choices=multiprocessing.get_all_start_methods())
+    args = parser.parse_args()
+    if args.start_method:
+        multiprocessing.set_start_method(args.start_method)
+
+    frame = cv2.imread(args.image) if args.image else synthetic_frame(640, 480)
+    print(f"{os.cpu_count()} cores, frame {frame.shape[1]}x{frame.shape[0]}")
+    print(f"{'workers':>7} {'fps':>8} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        backend = ProcessPoseBackend(workers, max_width=frame.shape[1], max_height=frame.shape[0], timeout=60)
+        try:
+            # Warm every worker's graph before measuring
+            for i in range(workers * 4):
+                backend.detect(Session(f"warmup-{i}"), frame)
+            fps = run(backend, frame, workers * 2, args.seconds)
+        finally:
+            backend.close()
+        baseline = baseline or fps
+        print(f"{workers:>7} {fps:>8.1f} {fps / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
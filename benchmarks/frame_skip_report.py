@@ -0,0 +1,112 @@
+"""CPU saved and rep-count accuracy kept by frame skipping on recorded workouts.
+
+Each video is replayed at its native frame rate, once with inference on every
+frame and once per skipping configuration. Rep counts are compared against
+ground truth from --labels (a JSON object of file name -> reps) when given,
+otherwise against the every-frame run.
+
+Usage: python benchmarks/frame_skip_report.py --exercise Squats videos/*.mp4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from angles import joint_angles
+from exercises import EXERCISES
+from frame_skip import FrameSkipper
+from landmarks import landmarks_to_array
+from sessions import ExerciseState
+
+CONFIGS = [('every frame', None, 1)] + [(f'1 in {n}', 'auto', n) for n in (2, 3, 4)] + [('motion', 'motion', 4)]
+
+
+def load_video(path):
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames, fps
+
+
+def count_reps(frames, fps, exercise, mode, interval):
+    pose = mp.solutions.pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    skipper = FrameSkipper(mode, max_interval=interval) if mode else None
+    state = ExerciseState()
+    inferences = 0
+
+    start = time.process_time()
+    for i, frame in enumerate(frames):
+        now = i / fps
+        if skipper is not None and not skipper.should_infer(frame, now, interval):
+            landmarks = skipper.predict(now)
+        else:
+            inferences += 1
+            results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            landmarks = landmarks_to_array(results.pose_landmarks) if results.pose_landmarks else None
+            if skipper is not None:
+                skipper.record(frame, landmarks, now)
+        if landmarks is not None:
+            exercise.update(state, landmarks, joint_angles(landmarks))
+    cpu = time.process_time() - start
+    pose.close()
+    return state.reps, inferences, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('videos', nargs='+')
+    parser.add_argument('--exercise', required=True, choices=sorted(EXERCISES))
+    parser.add_argument('--labels', help='JSON file mapping video file name to true rep count')
+    args = parser.parse_args()
+
+    labels = {}
+    if args.labels:
+        with open(args.labels) as f:
+            labels = json.load(f)
+    exercise = EXERCISES[args.exercise]
+
+    totals = {label: {'cpu': 0.0, 'inferences': 0, 'error': 0, 'exact': 0} for label, _, _ in CONFIGS}
+    frame_total = 0
+    rep_total = 0
+    for path in args.videos:
+        frames, fps = load_video(path)
+        frame_total += len(frames)
+        truth = labels.get(os.path.basename(path))
+        line = [f"{os.path.basename(path)}: {len(frames)} frames @ {fps:.0f}fps"]
+        for label, mode, interval in CONFIGS:
+            reps, inferences, cpu = count_reps(frames, fps, exercise, mode, interval)
+            if truth is None and mode is None:
+                truth = reps
+            line.append(f"{label}={reps}")
+            stats = totals[label]
+            stats['cpu'] += cpu
+            stats['inferences'] += inferences
+            stats['error'] += abs(reps - truth)
+            stats['exact'] += reps == truth
+        rep_total += truth
+        print(', '.join(line) + f" (truth {truth})")
+
+    baseline_cpu = totals['every frame']['cpu']
+    print()
+    print(f"{'config':<12} {'inferred':>9} {'cpu saved':>10} {'rep accuracy':>13} {'exact videos':>13}")
+    for label, _, _ in CONFIGS:
+        stats = totals[label]
+        accuracy = 1 - stats['error'] / rep_total if rep_total else 1.0
+        print(f"{label:<12} {stats['inferences'] / frame_total:>9.1%} {1 - stats['cpu'] / baseline_cpu:>10.1%} "
+              f"{accuracy:>13.1%} {stats['exact']:>6}/{len(args.videos)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Overload /process_frame and report latency of admitted vs shed frames.
+
+Each client is one user with its own session sending raw JPEG frames back to
+back, as the dashboard does, and waiting out Retry-After when shed. Run the
+server with rate limiting off, once with admission control and once with it
+effectively disabled, to see the latency ceiling it holds:
+
+  FLASK_RATELIMIT_ENABLED=false python main.py
+  FLASK_RATELIMIT_ENABLED=false MAX_IN_FLIGHT=1000 LATENCY_SLO_MS=1000000 python main.py
+
+Usage: python benchmarks/load_test.py --clients 16 --seconds 20
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+import uuid
+from urllib.parse import urlencode, urlsplit
+
+import cv2
+
+from bench_upload import synthetic_frame
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_client(args, jpeg, results):
+    url = urlsplit(args.url)
+    query = urlencode({'exercise_type': args.exercise, 'session_id': str(uuid.uuid4())})
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        start = time.perf_counter()
+        try:
+            connection.request('POST', f"{url.path}?{query}", body=jpeg, headers={'Content-Type': 'image/jpeg'})
+            response = connection.getresponse()
+            response.read()
+        except OSError:
+            results['failed'] += 1
+            continue
+        finally:
+            connection.close()
+        latency = time.perf_counter() - start
+        results.setdefault(response.status, []).append(latency)
+        if response.status in (429, 503):
+            time.sleep(min(float(response.getheader('Retry-After') or 1), args.max_backoff))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:3001/process_frame')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--exercise', default='Squats')
+    parser.add_argument('--image', help='frame to send; defaults to a synthetic 640x480 frame')
+    parser.add_argument('--max-backoff', type=float, default=1.0, help='cap on Retry-After waits')
+    args = parser.parse_args()
+
+    frame = cv2.imread(args.image) if args.image else synthetic_frame(640, 480)
+    jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+    per_client = [{'failed': 0} for _ in range(args.clients)]
+    threads = [threading.Thread(target=run_client, args=(args, jpeg, results)) for results in per_client]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results = {'failed': 0}
+    for client in per_client:
+        results['failed'] += client.pop('failed')
+        for status, latencies in client.items():
+            results.setdefault(status, []).extend(latencies)
+
+    print(f"{args.clients} clients for {args.seconds:.0f}s, {results.pop('failed')} failed connections")
+    print(f"{'status':>6} {'count':>7} {'per s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for status, latencies in sorted(results.items()):
+        print(f"{status:>6} {len(latencies):>7} {len(latencies) / args.seconds:>7.1f} "
+              f"{statistics.median(latencies) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.99) * 1000:>8.1f} {max(latencies) * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
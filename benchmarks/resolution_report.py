@@ -0,0 +1,93 @@
+"""Landmark accuracy vs latency for each reduced-decode scale on recorded clips.
+
+Every frame is JPEG-encoded as the dashboard would send it, then decoded at
+scale 1, 2, 4 and 8 and run through a separate Pose graph per scale.
+Accuracy is reported against the full-resolution landmarks as the mean
+distance in normalised image units over visible landmarks, together with
+the detection rate and the mean decode + inference time per frame.
+
+Usage: python benchmarks/resolution_report.py clip1.mp4 [clip2.mp4 ...]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import decode_image
+from landmarks import landmarks_to_array
+from resolution import SCALES
+
+
+def read_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.isOpened() and count < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        count += 1
+        yield frame
+    cap.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('clips', nargs='+')
+    parser.add_argument('--max-frames', type=int, default=600, help='per clip')
+    parser.add_argument('--quality', type=int, default=80, help='JPEG quality of the simulated upload')
+    parser.add_argument('--visibility', type=float, default=0.5)
+    args = parser.parse_args()
+
+    errors = {scale: [] for scale in SCALES}
+    detected = {scale: 0 for scale in SCALES}
+    seconds = {scale: 0.0 for scale in SCALES}
+    total = 0
+    heights = set()
+
+    for clip in args.clips:
+        poses = {scale: mp.solutions.pose.Pose() for scale in SCALES}
+        for frame in read_frames(clip, args.max_frames):
+            total += 1
+            jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, args.quality])[1].tobytes()
+            heights.add(frame.shape[0])
+            reference = None
+            for scale in SCALES:
+                start = time.perf_counter()
+                image = cv2.cvtColor(decode_image(jpeg, scale), cv2.COLOR_BGR2RGB)
+                results = poses[scale].process(image)
+                seconds[scale] += time.perf_counter() - start
+                if not results.pose_landmarks:
+                    continue
+                detected[scale] += 1
+                landmarks = landmarks_to_array(results.pose_landmarks)
+                if scale == 1:
+                    reference = landmarks
+                elif reference is not None:
+                    visible = reference[:, 3] >= args.visibility
+                    if visible.any():
+                        offsets = landmarks[visible, :2] - reference[visible, :2]
+                        errors[scale].append(float(np.linalg.norm(offsets, axis=1).mean()))
+        for pose in poses.values():
+            pose.close()
+
+    if not total:
+        sys.exit("No frames read")
+    print(f"{total} frames from {len(args.clips)} clip(s), source heights {sorted(heights)}")
+    print(f"{'scale':>5} {'detected':>9} {'mean err':>9} {'p95 err':>9} {'ms/frame':>9} {'speedup':>8}")
+    for scale in SCALES:
+        err = np.array(errors[scale]) if errors[scale] else np.zeros(1)
+        mean_err = '-' if scale == 1 else f"{err.mean():.4f}"
+        p95_err = '-' if scale == 1 else f"{np.percentile(err, 95):.4f}"
+        ms = seconds[scale] / total * 1000
+        print(f"{scale:>5} {detected[scale] / total:>9.1%} {mean_err:>9} {p95_err:>9} "
+              f"{ms:>9.2f} {seconds[1] / seconds[scale]:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Import time, time to ready and first-request latency for each startup setup.
+
+Import cost per top-level package comes from `python -X importtime`. Each
+worker setup is then measured in its own process, with a one-graph pool:
+
+  cold            fresh interpreter, graph built on startup, no warm-up
+  cold + warm-up  fresh interpreter, graph built and warmed up on startup
+  preloaded fork  forked from a parent that already imported the app with
+                  POSE_STARTUP=preload, as a pre-fork server does
+
+Ready is the time from process start until the pose backend is ready. The
+first request and the median of the next five go through the Flask app.
+
+Usage: python benchmarks/startup_report.py [--image person.jpg]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import cv2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from frames import synthetic_person
+
+PACKAGES = ('main', 'mediapipe', 'cv2', 'numpy', 'flask', 'flask_sock')
+
+
+def import_times(env):
+    """Cumulative import seconds per package from -X importtime"""
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=ROOT,
+                            env=env, capture_output=True, text=True).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if name in PACKAGES:
+            times[name] = max(times.get(name, 0), int(cumulative) / 1e6)
+    return times
+
+
+def measure(jpeg, started, imported):
+    """Wait for the pose backend, then time requests; runs inside the measured process"""
+    import main
+
+    main.start_inference(background=False)
+    ready = time.perf_counter() - started
+    client = main.app.test_client()
+    latencies = []
+    for i in range(6):
+        start = time.perf_counter()
+        response = client.post('/process_frame', data=jpeg, content_type='image/jpeg',
+                               query_string={'exercise_type': 'Squats', 'session_id': 'startup'})
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"/process_frame returned {response.status_code}")
+    return {
+        'import': imported,
+        'ready': ready,
+        'first': latencies[0],
+        'steady': statistics.median(latencies[1:])
+    }
+
+
+def child(jpeg_path):
+    started = time.perf_counter()
+    import main  # noqa: F401
+    imported = time.perf_counter() - started
+    with open(jpeg_path, 'rb') as f:
+        jpeg = f.read()
+    print(json.dumps(measure(jpeg, started, imported)))
+
+
+def cold(jpeg_path, env):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', jpeg_path], cwd=ROOT,
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def forked(jpeg, results):
+    results.put(measure(jpeg, time.perf_counter(), 0.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--image', help='frame to send; defaults to a synthetic figure')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    frame = cv2.imread(args.image) if args.image else synthetic_person()
+    jpeg = cv2.imencode('.jpg', frame)[1].tobytes()
+    jpeg_path = os.path.join(ROOT, '.startup_report.jpg')
+    with open(jpeg_path, 'wb') as f:
+        f.write(jpeg)
+
+    env = dict(os.environ, POSE_POOL_SIZE='1')
+    try:
+        print('import time (cumulative seconds)')
+        print(f"{'package':<14} {'deferred':>9} {'preload':>9}")
+        deferred = import_times(dict(env, POSE_STARTUP='background'))
+        preloaded = import_times(dict(env, POSE_STARTUP='preload'))
+        for package in PACKAGES:
+            print(f"{package:<14} {deferred.get(package, 0):>9.3f} {preloaded.get(package, 0):>9.3f}")
+
+        rows = [
+            ('cold', cold(jpeg_path, dict(env, POSE_STARTUP='blocking', POSE_WARMUP='0'))),
+            ('cold + warm-up', cold(jpeg_path, dict(env, POSE_STARTUP='blocking', POSE_WARMUP='1'))),
+        ]
+    finally:
+        os.remove(jpeg_path)
+
+    # The parent imports the app without building anything, then forks
+    os.environ.update(env, POSE_STARTUP='preload', POSE_WARMUP='1')
+    import main as server  # noqa: F401
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    process = context.Process(target=forked, args=(jpeg, results))
+    process.start()
+    rows.append(('preloaded fork', results.get(timeout=120)))
+    process.join()
+
+    print()
+    print(f"{'setup':<16} {'import s':>9} {'ready s':>8} {'first ms':>9} {'steady ms':>10}")
+    for label, row in rows:
+        print(f"{label:<16} {row['import']:>9.3f} {row['ready']:>8.3f} "
+              f"{row['first'] * 1000:>9.1f} {row['steady'] * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Load client for the /stream WebSocket endpoint.
+
+Opens N concurrent connections, pushes JPEG frames at a fixed rate (or as
+fast as possible with --fps 0) and reports per-connection throughput, drop
+rate and frame-to-event latency.
+
+Usage: python benchmarks/stream_client.py --connections 4 --seconds 10 --fps 30
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import uuid
+
+import cv2
+from simple_websocket import Client, ConnectionClosed
+
+from bench_upload import synthetic_frame
+
+
+def run_connection(args, jpeg, report):
+    session_id = str(uuid.uuid4())
+    ws = Client(f"{args.url}?exercise_type={args.exercise}&session_id={session_id}")
+    sent_at = {}
+    latencies = []
+    sent = 0
+    deadline = time.perf_counter() + args.seconds
+
+    def receive():
+        try:
+            while True:
+                event = json.loads(ws.receive())
+                latencies.append(time.perf_counter() - sent_at.pop(event['f']))
+        except (ConnectionClosed, KeyError, TypeError):
+            pass
+
+    receiver = threading.Thread(target=receive, daemon=True)
+    receiver.start()
+
+    interval = 1.0 / args.fps if args.fps else 0.0
+    next_send = time.perf_counter()
+    while time.perf_counter() < deadline:
+        sent += 1
+        sent_at[sent] = time.perf_counter()
+        ws.send(jpeg)
+        if interval:
+            next_send += interval
+            time.sleep(max(0.0, next_send - time.perf_counter()))
+
+    # Let in-flight frames drain before closing
+    time.sleep(0.5)
+    ws.close()
+    receiver.join(timeout=1)
+    report.append((sent, latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='ws://localhost:3001/stream')
+    parser.add_argument('--connections', type=int, default=1)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--fps', type=float, default=30, help='0 sends as fast as possible')
+    parser.add_argument('--exercise', default='Squats')
+    parser.add_argument('--image', help='JPEG to send instead of a synthetic 640x480 frame')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    frame = cv2.imread(args.image) if args.image else synthetic_frame(args.width, args.height)
+    jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+    report = []
+    threads = [threading.Thread(target=run_connection, args=(args, jpeg, report))
+               for _ in range(args.connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"{'conn':>4} {'sent':>6} {'done':>6} {'fps':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for i, (sent, latencies) in enumerate(report):
+        done = len(latencies)
+        if latencies:
+            ordered = sorted(latencies)
+            p50 = statistics.median(ordered) * 1000
+            p95 = ordered[int(len(ordered) * 0.95) - 1 if len(ordered) > 1 else 0] * 1000
+        else:
+            p50 = p95 = float('nan')
+        print(f"{i:>4} {sent:>6} {done:>6} {done / args.seconds:>7.1f} {p50:>8.1f} {p95:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Headless webcam_interface run on a video file: serial loop vs pipelined threads.
+
+The file stands in for the camera. In pipelined mode it is paced to its own
+frame rate like a live camera, and the report shows per-stage FPS and how
+many captured frames inference skipped to stay current.
+
+Usage: python benchmarks/webcam_pipeline.py workout.mp4 [--display]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('video')
+    parser.add_argument('--exercise', default='Pushups', choices=server.EXERCISE_TYPES)
+    parser.add_argument('--display', action='store_true', help='show the window instead of running headless')
+    args = parser.parse_args()
+
+    serial = server.webcam_interface(args.video, pipelined=False, display=args.display, exercise_type=args.exercise)
+    print(f"serial:    {serial['fps']} fps over {serial['frames']} frames, {serial['reps']} reps")
+    report = server.webcam_interface(args.video, display=args.display, exercise_type=args.exercise)
+    print(f"pipelined: capture {report['capture']} / inference {report['inference']} / "
+          f"display {report['display']} fps, {report['capture_dropped']} of {report['frames']} "
+          f"frames skipped by inference, {report['reps']} reps")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class BufferPool:
+    """Reusable NumPy buffers keyed by shape and dtype.
+
+    Frames of one session mostly share a resolution, so a handful of keys
+    cover the steady state and each frame takes a buffer back from a free
+    list instead of allocating one. At most `per_key` free buffers are kept
+    per key, and only the `max_keys` most recently used keys are kept at all,
+    so odd sizes do not pin memory. Buffers over `max_bytes` are never kept:
+    one oversized request should not hold its memory for good.
+    """
+
+    def __init__(self, per_key=4, max_keys=16, max_bytes=4 << 20):
+        self.per_key = per_key
+        self.max_keys = max_keys
+        self.max_bytes = max_bytes
+        self._free = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        key = (tuple(shape), np.dtype(dtype).str)
+        lock = self._lock
+        lock.acquire()
+        try:
+            free = self._free.get(key)
+            if free:
+                self._free.move_to_end(key)
+                self.hits += 1
+                return free.pop()
+            self.misses += 1
+        finally:
+            lock.release()
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, array):
+        """Return a buffer from acquire(); views of it must no longer be in use"""
+        if array.nbytes > self.max_bytes:
+            return
+        array.flags.writeable = True
+        key = (array.shape, array.dtype.str)
+        lock = self._lock
+        lock.acquire()
+        try:
+            free = self._free.get(key)
+            if free is None:
+                free = self._free[key] = []
+                if len(self._free) > self.max_keys:
+                    self._free.popitem(last=False)
+            else:
+                self._free.move_to_end(key)
+            if len(free) < self.per_key:
+                free.append(array)
+        finally:
+            lock.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'keys': len(self._free),
+                'free': sum(len(free) for free in self._free.values()),
+                'free_bytes': sum(array.nbytes for free in self._free.values() for array in free),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+def body_capacity(length):
+    """Size class for a request body: the next power of two, at least 64 KiB"""
+    return max(1 << 16, 1 << (length - 1).bit_length())
+
+
+def read_into(stream, length, pool):
+    """Read exactly length bytes from stream into a pooled buffer.
+
+    Returns (buffer, view of the data), or (buffer, None) if the stream
+    ended early; the buffer goes back to the pool either way.
+    """
+    capacity = body_capacity(length)
+    if capacity > pool.max_bytes:
+        # Not kept by the pool anyway, so no point rounding it up
+        capacity = length
+    buffer = pool.acquire((capacity,))
+    view = memoryview(buffer)[:length]
+    received = 0
+    while received < length:
+        count = stream.readinto(view[received:])
+        if not count:
+            return buffer, None
+        received += count
+    return buffer, buffer[:length]
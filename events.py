@@ -0,0 +1,55 @@
+import json
+import threading
+from collections import deque
+
+# Consecutive frames without a pose before a 'no_pose' warning is sent
+NO_POSE_WARNING_FRAMES = 15
+
+
+class EventChannel:
+    """Per-session stream of state-change events for server-sent events.
+
+    Events get increasing ids and the last `history` of them are kept, so a
+    client reconnecting with Last-Event-ID receives what it missed. Any
+    number of subscribers can wait on the same channel.
+    """
+
+    def __init__(self, history=64):
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=history)
+        self._last_id = 0
+        self.missed_frames = 0
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def publish(self, kind, data):
+        with self._cond:
+            self._last_id += 1
+            self._events.append((self._last_id, kind, data))
+            self._cond.notify_all()
+
+    def pose_seen(self, detected):
+        """Count frames without a pose, raising or clearing the no_pose warning"""
+        if not detected:
+            self.missed_frames += 1
+            if self.missed_frames == NO_POSE_WARNING_FRAMES:
+                self.publish('warning', {'code': 'no_pose', 'active': True})
+        elif self.missed_frames:
+            if self.missed_frames >= NO_POSE_WARNING_FRAMES:
+                self.publish('warning', {'code': 'no_pose', 'active': False})
+            self.missed_frames = 0
+
+    def wait(self, after_id, timeout=None):
+        """Events with an id above after_id, waiting up to timeout for the first one"""
+        with self._cond:
+            if self._last_id <= after_id:
+                self._cond.wait(timeout)
+            return [event for event in self._events if event[0] > after_id]
+
+
+def format_event(event_id, kind, data):
+    """One server-sent event; events without an id do not move the client's Last-Event-ID"""
+    message = f"event: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+    return message if event_id is None else f"id: {event_id}\n" + message
@@ -0,0 +1,279 @@
+import numpy as np
+
+from angles import JOINT_INDEX, joint_angles
+from landmarks import LEFT_ANKLE, LEFT_HIP, LEFT_KNEE, LEFT_SHOULDER, NOSE
+
+# Every exercise counts reps with the same two-stage state machine over one
+# signal. The 'start' stage is entered from any other stage once the signal
+# passes its threshold; the 'finish' stage can only be entered from 'start'
+# and completes a rep. Hysteresis pushes both thresholds further apart.
+# 'concentric' names the stage the muscle shortens moving towards, 'finish'
+# unless given.
+#
+# Signals:
+#   ('angle', joint)  joint angle in degrees, see angles.JOINTS
+#   ('dy', a, b)      landmarks[b].y - landmarks[a].y in normalised units
+DEFINITIONS = {
+    'Pushups': {
+        'signal': ('angle', 'left_upper_arm_vertical'),
+        'start': ('up', '>', 100),
+        'finish': ('down', '<', 55),
+        'concentric': 'start',
+    },
+    'Squats': {
+        'signal': ('angle', 'left_knee'),
+        'start': ('up', '>', 150),
+        'finish': ('down', '<', 110),
+        'concentric': 'start',
+    },
+    'Bicep Curls': {
+        'signal': ('angle', 'left_elbow'),
+        'start': ('down', '>', 160),
+        'finish': ('up', '<', 30),
+    },
+    # Ported from the legacy desktop tracker, which compared landmark heights
+    'Lunges': {
+        'signal': ('dy', LEFT_HIP, LEFT_ANKLE),
+        'start': ('down', '<', 0.0),
+        'finish': ('up', '>', 0.0),
+        'hysteresis': 0.02,
+    },
+    'Crunches': {
+        'signal': ('dy', NOSE, LEFT_KNEE),
+        'start': ('down', '<', 0.0),
+        'finish': ('up', '>', 0.0),
+        'hysteresis': 0.02,
+    },
+    'Planks': {
+        'signal': ('dy', LEFT_SHOULDER, LEFT_ANKLE),
+        'start': ('down', '<', 0.0),
+        'finish': ('up', '>', 0.0),
+        'hysteresis': 0.02,
+    },
+}
+
+# Stage indices; 0 means no stage has been reached yet
+NO_STAGE, START, FINISH = 0, 1, 2
+
+# Signal zones: between thresholds, past the start threshold, past the finish threshold
+NEUTRAL, START_ZONE, FINISH_ZONE = 0, 1, 2
+
+# The zone each stage is entered from
+STAGE_ZONES = (NEUTRAL, START_ZONE, FINISH_ZONE)
+
+SIGNS = {'>': 1.0, '<': -1.0}
+
+
+def _signal(spec):
+    kind = spec[0]
+    if kind == 'angle':
+        joint = JOINT_INDEX[spec[1]]
+        return lambda landmarks, angles: float(angles[joint])
+    if kind == 'dy':
+        a, b = spec[1], spec[2]
+        return lambda landmarks, angles: float(landmarks[b, 1] - landmarks[a, 1])
+    raise ValueError(f"Unknown signal type: {kind}")
+
+
+def _batch_signal(spec):
+    """Signal over an (N, 33, 4) landmark batch, computing only what it needs"""
+    kind = spec[0]
+    if kind == 'angle':
+        joints = [JOINT_INDEX[spec[1]]]
+        return lambda landmarks: joint_angles(landmarks, joints)[:, 0]
+    if kind == 'dy':
+        a, b = spec[1], spec[2]
+        return lambda landmarks: landmarks[:, b, 1] - landmarks[:, a, 1]
+    raise ValueError(f"Unknown signal type: {kind}")
+
+
+def _transition_table():
+    table = []
+    for stage in (NO_STAGE, START, FINISH):
+        for zone in (NEUTRAL, START_ZONE, FINISH_ZONE):
+            if zone == START_ZONE:
+                table.append((START, 0))
+            elif zone == FINISH_ZONE and stage == START:
+                table.append((FINISH, 1))
+            else:
+                table.append((stage, 0))
+    return tuple(table)
+
+
+class RepMetrics:
+    """Tempo, range of motion and time under tension of each rep, kept up frame by frame.
+
+    A rep runs from the last frame in the start zone, through the finish
+    zone (where it is counted), back to the first frame in the start zone.
+    Every frame updates a few scalars in constant time: the signal's range
+    and peak speed, and when the zones were left and entered. When the rep
+    closes they become a record, so no frame history is kept or rescanned.
+    Times are in seconds; min, max and peak_velocity are in the exercise's
+    signal units, degrees for joint angles.
+    """
+
+    __slots__ = ('concentric_start', 'value', 'timestamp', 'low', 'high', 'peak_velocity', 'start_last',
+                 'finish_first', 'finish_last', 'closed')
+
+    def __init__(self, concentric_start=False):
+        # True when the concentric phase is the return from finish to start
+        self.concentric_start = concentric_start
+        self.timestamp = None
+        self.start_last = None
+        self.finish_first = None
+        self.finish_last = None
+        # Record of the rep closed by the last frame, or None
+        self.closed = None
+
+    def observe(self, value, zone, stage_index, reps, now):
+        """Account for one frame; stage_index is the stage before it. Returns a closed rep's record or None"""
+        if self.timestamp is None:
+            self.low = self.high = value
+            self.peak_velocity = 0.0
+        else:
+            dt = now - self.timestamp
+            if dt > 0:
+                speed = abs(value - self.value) / dt
+                if speed > self.peak_velocity:
+                    self.peak_velocity = speed
+            if value < self.low:
+                self.low = value
+            elif value > self.high:
+                self.high = value
+        self.value = value
+        self.timestamp = now
+
+        record = None
+        if zone == START_ZONE:
+            if stage_index == FINISH and self.finish_first is not None:
+                record = self._close(reps, now)
+            self.start_last = now
+        elif zone == FINISH_ZONE and stage_index != NO_STAGE:
+            if stage_index == START:
+                self.finish_first = now
+            self.finish_last = now
+        self.closed = record
+        return record
+
+    def _close(self, reps, now):
+        to_finish = self.finish_first - self.start_last
+        to_start = now - self.finish_last
+        concentric, eccentric = (to_start, to_finish) if self.concentric_start else (to_finish, to_start)
+        record = {
+            'rep': reps,
+            'concentric': round(concentric, 3),
+            'eccentric': round(eccentric, 3),
+            'hold': round(self.finish_last - self.finish_first, 3),
+            'time_under_tension': round(now - self.start_last, 3),
+            'min': round(self.low, 3),
+            'max': round(self.high, 3),
+            'peak_velocity': round(self.peak_velocity, 3)
+        }
+        # The next rep's range starts from here
+        self.low = self.high = self.value
+        self.peak_velocity = 0.0
+        self.finish_first = self.finish_last = None
+        return record
+
+
+class Exercise:
+    """A compiled exercise definition.
+
+    Both thresholds are folded into sign-adjusted bounds, so classifying the
+    signal is two multiplications and comparisons, and the next stage and rep
+    increment come from a single lookup in a flat (stage, zone) table.
+    """
+
+    __slots__ = ('name', 'stages', 'signal', 'batch_signal', 'start_sign', 'start_bound',
+                 'finish_sign', 'finish_bound', 'table', 'concentric_start')
+
+    def __init__(self, name, definition):
+        start_stage, start_op, start_threshold = definition['start']
+        finish_stage, finish_op, finish_threshold = definition['finish']
+        if start_op not in SIGNS or finish_op not in SIGNS:
+            raise ValueError(f"{name}: comparisons must be '>' or '<'")
+        if start_op == finish_op:
+            raise ValueError(f"{name}: start and finish must compare in opposite directions")
+
+        hysteresis = definition.get('hysteresis', 0.0)
+        self.name = name
+        self.stages = (None, start_stage, finish_stage)
+        self.signal = _signal(definition['signal'])
+        self.batch_signal = _batch_signal(definition['signal'])
+        # value * sign > bound  <=>  value > threshold + hysteresis (or < for '<')
+        self.start_sign = SIGNS[start_op]
+        self.start_bound = self.start_sign * start_threshold + hysteresis
+        self.finish_sign = SIGNS[finish_op]
+        self.finish_bound = self.finish_sign * finish_threshold + hysteresis
+        if self.start_bound + self.finish_bound < 0:
+            raise ValueError(f"{name}: start and finish thresholds overlap")
+        self.table = _transition_table()
+        concentric = definition.get('concentric', 'finish')
+        if concentric not in ('start', 'finish'):
+            raise ValueError(f"{name}: concentric must be 'start' or 'finish'")
+        self.concentric_start = concentric == 'start'
+
+    def update(self, state, landmarks, angles, now=None):
+        """Advance state by one frame and return 1 if a rep was completed, else 0.
+
+        Given the frame's time now, in seconds, per-rep metrics are kept in
+        state.metrics too, and state.metrics.closed holds the record of a rep
+        this frame closed.
+        """
+        value = self.signal(landmarks, angles)
+        zone = (value * self.start_sign > self.start_bound) + 2 * (value * self.finish_sign > self.finish_bound)
+        stage_index = state.stage_index
+        state.stage_index, completed = self.table[stage_index * 3 + zone]
+        state.reps += completed
+        if now is not None:
+            metrics = state.metrics
+            if metrics is None:
+                metrics = state.metrics = RepMetrics(self.concentric_start)
+            metrics.observe(value, zone, stage_index, state.reps, now)
+        return completed
+
+    def stage_name(self, state):
+        return self.stages[state.stage_index]
+
+    def replay(self, landmarks, stage_index=NO_STAGE, reps=0):
+        """Run the state machine over an (N, 33, 4) batch, from a fresh state by default.
+
+        Returns per-frame stage indices and rep counts, identical to calling
+        update() frame by frame. Frames without a pose are NaN and leave the
+        state alone. Vectorised from the table's rules: a frame in the start
+        zone enters START, and a frame in the finish zone is a rep when the
+        last zone seen before it was the start zone. A starting stage stands
+        in for the zone that led to it.
+        """
+        value = self.batch_signal(landmarks)
+        zone = ((value * self.start_sign > self.start_bound).astype(np.int8)
+                + 2 * (value * self.finish_sign > self.finish_bound))
+        initial_zone = STAGE_ZONES[stage_index]
+
+        # Index of the most recent frame outside the neutral zone, -1 if none yet
+        frames = np.arange(len(zone))
+        last = np.maximum.accumulate(np.where(zone != NEUTRAL, frames, -1))
+        last_zone = np.where(last >= 0, zone[np.maximum(last, 0)], initial_zone)
+        previous_zone = np.concatenate(([initial_zone], last_zone[:-1]))
+
+        reps = reps + np.cumsum((zone == FINISH_ZONE) & (previous_zone == START_ZONE), dtype=np.int64)
+        started = np.maximum.accumulate(zone == START_ZONE) | (stage_index != NO_STAGE)
+        stages = np.where(last_zone == START_ZONE, START,
+                          np.where((last_zone == FINISH_ZONE) & started, FINISH, NO_STAGE)).astype(np.int8)
+        return stages, reps
+
+    def advance(self, state, landmarks):
+        """Advance state over an (N, 33, 4) batch; returns replay()'s per-frame arrays"""
+        if len(landmarks) == 1:
+            # A single frame is several times cheaper through update()
+            frame = landmarks[0]
+            self.update(state, frame, joint_angles(frame))
+            return np.array([state.stage_index], dtype=np.int8), np.array([state.reps], dtype=np.int64)
+        stages, reps = self.replay(landmarks, state.stage_index, state.reps)
+        if len(stages):
+            state.stage_index = int(stages[-1])
+            state.reps = int(reps[-1])
+        return stages, reps
+
+
+EXERCISES = {name: Exercise(name, definition) for name, definition in DEFINITIONS.items()}
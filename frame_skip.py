@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+
+MODES = ('off', 'auto', 'motion')
+
+THUMBNAIL_SIZE = (32, 24)
+
+
+def skip_interval(load, max_interval=4):
+    """Run inference on every Nth frame, with N growing once the backend is over half busy"""
+    if load <= 0.5:
+        return 1
+    return min(max_interval, 1 + int((load - 0.5) * 2 * max_interval))
+
+
+class FrameSkipper:
+    """Decides per session which frames get pose inference.
+
+    In 'auto' mode every Nth frame is inferred, N coming from server load. In
+    'motion' mode frames are inferred when a 32x24 grayscale thumbnail differs
+    enough from the one at the last inference, and still frames are skipped
+    up to max_interval. Skipped frames get landmarks extrapolated linearly
+    from the last two inferences, for at most max_horizon seconds, so stage
+    transitions between inferences still fire.
+    """
+
+    __slots__ = ('mode', 'max_interval', 'motion_threshold', 'max_horizon', 'skipped',
+                 'landmarks', 'velocity', 'timestamp', 'thumbnail')
+
+    def __init__(self, mode='auto', max_interval=4, motion_threshold=4.0, max_horizon=0.25):
+        if mode not in MODES:
+            raise ValueError(f"Unknown frame skip mode: {mode}")
+        self.mode = mode
+        self.max_interval = max_interval
+        self.motion_threshold = motion_threshold
+        self.max_horizon = max_horizon
+        self.skipped = 0
+        self.landmarks = None
+        self.velocity = None
+        self.timestamp = None
+        self.thumbnail = None
+
+    def should_infer(self, frame, now, interval):
+        if self.mode == 'off' or self.landmarks is None or now - self.timestamp > self.max_horizon:
+            return True
+        if self.mode == 'motion':
+            if self.skipped + 1 >= self.max_interval or self._moved(frame):
+                return True
+        elif self.skipped + 1 >= interval:
+            return True
+        self.skipped += 1
+        return False
+
+    def record(self, frame, landmarks, now):
+        """Store the result of an inference; landmarks may be None"""
+        self.skipped = 0
+        if landmarks is None:
+            self.landmarks = self.velocity = None
+            return
+        if self.landmarks is not None and now > self.timestamp:
+            self.velocity = (landmarks - self.landmarks) / (now - self.timestamp)
+        else:
+            self.velocity = None
+        self.landmarks = landmarks
+        self.timestamp = now
+        if self.mode == 'motion':
+            self.thumbnail = self._thumbnail(frame)
+
+    def predict(self, now):
+        if self.velocity is None:
+            return self.landmarks
+        predicted = self.landmarks + self.velocity * np.float32(now - self.timestamp)
+        # Visibility is a confidence, not a position
+        predicted[:, 3] = self.landmarks[:, 3]
+        return predicted
+
+    def _moved(self, frame):
+        thumbnail = self._thumbnail(frame)
+        return cv2.norm(thumbnail, self.thumbnail, cv2.NORM_L1) / thumbnail.size > self.motion_threshold
+
+    @staticmethod
+    def _thumbnail(frame):
+        small = cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+
+# Decode flags that let libjpeg scale the image down during decoding
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+# Start-of-frame markers carry the image size; DHT (C4), JPG (C8) and DAC (CC) do not
+SOF_MARKERS = frozenset((0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+
+
+def jpeg_size(buffer):
+    """Read (width, height) from a JPEG header without decoding, or None"""
+    data = memoryview(buffer)
+    length = len(data)
+    if length < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i = 2
+    while i + 8 < length:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            i += 1
+        elif marker in SOF_MARKERS:
+            height = data[i + 5] << 8 | data[i + 6]
+            width = data[i + 7] << 8 | data[i + 8]
+            return width, height
+        elif marker in (0xD9, 0xDA):
+            # End of image or start of scan before any frame header
+            return None
+        elif 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            i += 2
+        else:
+            i += 2 + (data[i + 2] << 8 | data[i + 3])
+    return None
+
+
+def decode_image(buffer, scale=1):
+    # np.frombuffer wraps the request bytes without copying them
+    return cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), REDUCED_DECODE_FLAGS[scale])
+
+
+def synthetic_person(width=640, height=480):
+    """A flat cartoon figure MediaPipe Pose detects, for warming up both of its models"""
+    image = np.full((height, width, 3), 200, dtype=np.uint8)
+    skin, shirt, pants = (140, 170, 220), (60, 60, 160), (80, 50, 30)
+    sx, sy = width / 640, height / 480
+
+    def p(x, y):
+        return int(width / 2 + x * sx), int(y * sy)
+
+    cv2.ellipse(image, p(0, 90), (int(28 * sx), int(36 * sy)), 0, 0, 360, skin, -1)
+    cv2.rectangle(image, p(-12, 120), p(12, 135), skin, -1)
+    cv2.rectangle(image, p(-55, 130), p(55, 270), shirt, -1)
+    cv2.line(image, p(-50, 140), p(-95, 270), shirt, int(26 * sx))
+    cv2.line(image, p(50, 140), p(95, 270), shirt, int(26 * sx))
+    cv2.circle(image, p(-97, 285), int(14 * sx), skin, -1)
+    cv2.circle(image, p(97, 285), int(14 * sx), skin, -1)
+    cv2.line(image, p(-30, 270), p(-40, 450), pants, int(36 * sx))
+    cv2.line(image, p(30, 270), p(40, 450), pants, int(36 * sx))
+    return image
@@ -0,0 +1,70 @@
+import numpy as np
+
+from angles import JOINT_NAMES
+from landmarks import NUM_LANDMARKS
+
+
+class LandmarkHistory:
+    """The last `capacity` frames of a session: landmarks, joint angles and timestamps.
+
+    Storage is allocated once and never grows. Every frame is written twice,
+    at its slot and `capacity` slots later, so the newest n frames are always
+    one contiguous slice and windows are views rather than copies. append()
+    is O(1); memory is about 2 * capacity * 580 bytes.
+    """
+
+    __slots__ = ('capacity', 'landmarks', 'angles', 'timestamps', 'head', 'count')
+
+    def __init__(self, capacity=64, joints=len(JOINT_NAMES)):
+        self.capacity = capacity
+        self.landmarks = np.zeros((2 * capacity, NUM_LANDMARKS, 4), dtype=np.float32)
+        self.angles = np.zeros((2 * capacity, joints), dtype=np.float32)
+        self.timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        # Next slot to write, in [0, capacity)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def append(self, landmarks, angles, timestamp):
+        head = self.head
+        mirror = head + self.capacity
+        self.landmarks[head] = self.landmarks[mirror] = landmarks
+        self.angles[head] = self.angles[mirror] = angles
+        self.timestamps[head] = self.timestamps[mirror] = timestamp
+        head += 1
+        self.head = 0 if head == self.capacity else head
+        if self.count < self.capacity:
+            self.count += 1
+
+    def window(self, frames=None):
+        """Read-only views of (landmarks, angles, timestamps) for the newest frames, oldest first"""
+        count = self.count if frames is None else min(frames, self.count)
+        # The newest frame sits just before head's mirror slot
+        end = self.head + self.capacity
+        window = slice(end - count, end)
+        landmarks = self.landmarks[window]
+        angles = self.angles[window]
+        timestamps = self.timestamps[window]
+        landmarks.flags.writeable = angles.flags.writeable = timestamps.flags.writeable = False
+        return landmarks, angles, timestamps
+
+    def window_seconds(self, seconds):
+        """window() of the frames no more than seconds older than the newest"""
+        if not self.count:
+            return self.window()
+        _, _, timestamps = self.window()
+        first = np.searchsorted(timestamps, timestamps[-1] - seconds)
+        return self.window(self.count - int(first))
+
+    def latest(self):
+        """(landmarks, angles, timestamp) of the newest frame, or None"""
+        if not self.count:
+            return None
+        landmarks, angles, timestamps = self.window(1)
+        return landmarks[0], angles[0], timestamps[0]
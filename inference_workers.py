@@ -0,0 +1,242 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import zlib
+from multiprocessing.shared_memory import SharedMemory
+
+import cv2
+import numpy as np
+
+from landmarks import NUM_LANDMARKS, landmarks_to_array
+from metrics import COLOR_SECONDS, INFERENCE_SECONDS
+from microbatch import MicroBatcher
+from pose_pool import PoolTimeout
+
+logger = logging.getLogger(__name__)
+
+# Each shared memory slot holds the landmark result followed by the RGB frame
+FRAME_OFFSET = 1024
+RESULT_SHAPE = (NUM_LANDMARKS, 4)
+
+
+def _worker_main(shm_names, requests, replies, pose_options):
+    import mediapipe as mp
+
+    # Workers share the front end's resource tracker, which unlinks the
+    # blocks if the front end dies without closing them
+    blocks = [SharedMemory(name=name) for name in shm_names]
+
+    pose = mp.solutions.pose.Pose(**pose_options)
+    image = None
+    try:
+        while True:
+            batch = requests.get()
+            if batch is None:
+                break
+            # Frames in a batch are processed in order and answered one by
+            # one, so early frames do not wait for the rest of the batch
+            for slot, height, width in batch:
+                buffer = blocks[slot].buf
+                image = np.ndarray((height, width, 3), dtype=np.uint8, buffer=buffer, offset=FRAME_OFFSET)
+                results = pose.process(image)
+                found = results.pose_landmarks is not None
+                if found:
+                    landmarks_to_array(results.pose_landmarks, np.ndarray(RESULT_SHAPE, dtype=np.float32, buffer=buffer))
+                replies.put((slot, found))
+    finally:
+        pose.close()
+        image = None
+        for block in blocks:
+            block.close()
+
+
+class ProcessPoseBackend:
+    """Pose inference in worker processes with shared-memory frame handoff.
+
+    Every worker owns a few shared memory slots. The front end converts the
+    decoded BGR frame straight into a free slot of the session's worker, sends
+    the slot index over a queue, and reads the (33, 4) landmark array back out
+    of the same slot, so frames are never pickled. Sessions are routed by a
+    stable hash of their id, which keeps each worker's tracking state valid.
+
+    With batch_wait above zero, frames for a worker are sent as micro-batches
+    of up to max_batch, collected for at most batch_wait seconds; each worker
+    gets enough slots to fill one batch while running the previous one.
+    """
+
+    def __init__(self, workers, slots_per_worker=2, max_width=1920, max_height=1080,
+                 timeout=2.0, pose_options=None, max_batch=8, batch_wait=0.0):
+        self.size = workers
+        if batch_wait > 0 and max_batch > 1:
+            slots_per_worker = max(slots_per_worker, 2 * max_batch)
+        self.timeout = timeout
+        self.max_width = max_width
+        self.max_height = max_height
+        self._slots_per_worker = slots_per_worker
+        context = multiprocessing.get_context()
+        slot_size = FRAME_OFFSET + max_width * max_height * 3
+
+        slot_count = workers * slots_per_worker
+        self._blocks = [SharedMemory(create=True, size=slot_size) for _ in range(slot_count)]
+        self._results = [np.ndarray(RESULT_SHAPE, dtype=np.float32, buffer=block.buf) for block in self._blocks]
+        self._done = [threading.Event() for _ in range(slot_count)]
+        self._found = [False] * slot_count
+        self._abandoned = [False] * slot_count
+        self._slot_lock = threading.Lock()
+        self._free = []
+        self._requests = []
+        self._replies = context.Queue()
+        self._processes = []
+
+        names = [block.name for block in self._blocks]
+        for worker in range(workers):
+            free = queue.Queue()
+            for slot in range(worker * slots_per_worker, (worker + 1) * slots_per_worker):
+                free.put(slot)
+            self._free.append(free)
+            requests = context.Queue()
+            self._requests.append(requests)
+            process = context.Process(
+                target=_worker_main,
+                args=(names, requests, self._replies, pose_options or {}),
+                name=f"pose-worker-{worker}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+        self._dispatcher = threading.Thread(target=self._dispatch_replies, name='pose-replies', daemon=True)
+        self._dispatcher.start()
+        self._batcher = None
+        if batch_wait > 0 and max_batch > 1:
+            self._batcher = MicroBatcher(workers, self._send_batch, max_batch=max_batch, max_wait=batch_wait)
+
+    def worker_for(self, session_id):
+        return zlib.crc32(session_id.encode()) % self.size
+
+    def detect(self, session, frame):
+        """Run pose detection on a BGR frame and return (33, 4) landmarks or None"""
+        return self._detect(self.worker_for(session.session_id), frame)
+
+    def warm_up(self, frames, timeout=60.0):
+        """Run every worker over the given BGR frames once, outside the metrics.
+
+        The timeout covers workers still importing MediaPipe.
+        """
+        for worker in range(self.size):
+            for frame in frames:
+                self._detect(worker, frame, observe=False, timeout=timeout)
+
+    def _detect(self, worker, frame, observe=True, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        try:
+            slot = self._free[worker].get(timeout=timeout)
+        except queue.Empty:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise PoolTimeout(f"Pose worker {worker} busy for more than {timeout}s")
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+
+        height, width = frame.shape[:2]
+        if width > self.max_width or height > self.max_height:
+            # Landmarks are normalised, so shrinking oversized frames is harmless
+            scale = min(self.max_width / width, self.max_height / height)
+            frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+            height, width = frame.shape[:2]
+
+        start = time.perf_counter()
+        image = np.ndarray((height, width, 3), dtype=np.uint8, buffer=self._blocks[slot].buf, offset=FRAME_OFFSET)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=image)
+        del image
+        if observe:
+            COLOR_SECONDS.observe(time.perf_counter() - start)
+
+        done = self._done[slot]
+        done.clear()
+        start = time.perf_counter()
+        if self._batcher is not None:
+            self._batcher.submit(worker, (slot, height, width))
+        else:
+            self._requests[worker].put([(slot, height, width)])
+        finished = done.wait(timeout)
+        if observe:
+            INFERENCE_SECONDS.observe(time.perf_counter() - start)
+        if not finished:
+            with self._slot_lock:
+                if not done.is_set():
+                    # The dispatcher frees the slot once the late reply arrives
+                    self._abandoned[slot] = True
+                    with self._stats_lock:
+                        self.timeouts += 1
+                    raise PoolTimeout(f"Pose worker {worker} did not answer within {timeout}s")
+
+        landmarks = self._results[slot].copy() if self._found[slot] else None
+        self._free[worker].put(slot)
+        return landmarks
+
+    def _send_batch(self, worker, batch):
+        self._requests[worker].put(batch)
+
+    def _dispatch_replies(self):
+        while True:
+            try:
+                message = self._replies.get()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+            slot, found = message
+            with self._slot_lock:
+                self._found[slot] = found
+                if self._abandoned[slot]:
+                    self._abandoned[slot] = False
+                    self._free[slot // self._slots_per_worker].put(slot)
+                else:
+                    self._done[slot].set()
+
+    def load(self):
+        """Fraction of workers with every slot in use"""
+        return sum(free.empty() for free in self._free) / self.size
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'size': self.size,
+                'busy': sum(free.empty() for free in self._free),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                'wait_max_ms': self.wait_max * 1000,
+                'batching': self._batcher.stats() if self._batcher else None
+            }
+
+    def close(self):
+        if self._batcher is not None:
+            self._batcher.close()
+        for requests in self._requests:
+            requests.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                logger.warning(f"{process.name} did not exit, terminating")
+                process.terminate()
+        self._replies.put(None)
+        self._dispatcher.join(timeout=1)
+        self._results = []
+        for block in self._blocks:
+            block.close()
+            block.unlink()
@@ -0,0 +1,85 @@
+import struct
+from array import array
+
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+
+# A cache file is a 64-byte header, then N frames of (33, 4) float32
+# landmarks, then N float64 timestamps in seconds. Frames without a detected
+# pose are stored as NaN. Both arrays are memory-mapped on read, so a
+# recording of any length opens instantly and pages in on demand.
+MAGIC = b'LMKC'
+VERSION = 1
+HEADER = struct.Struct('<4sIQd')  # magic, version, frame count, fps
+HEADER_SIZE = 64
+FRAME_SHAPE = (NUM_LANDMARKS, 4)
+FRAME_BYTES = NUM_LANDMARKS * 4 * 4
+
+EXTENSION = '.lmk'
+
+
+class LandmarkCacheWriter:
+    """Appends per-frame landmarks to a cache file; the header is written on close"""
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.fps = fps
+        self.count = 0
+        self._timestamps = array('d')
+        self._missing = np.full(FRAME_SHAPE, np.nan, dtype=np.float32).tobytes()
+        self._file = open(path, 'wb')
+        self._file.write(bytes(HEADER_SIZE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, timestamp, landmarks):
+        """Add one frame; landmarks is a (33, 4) array or None when no pose was found"""
+        if landmarks is None:
+            self._file.write(self._missing)
+        else:
+            self._file.write(np.ascontiguousarray(landmarks, dtype=np.float32).tobytes())
+        self._timestamps.append(timestamp)
+        self.count += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.write(self._timestamps.tobytes())
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.count, self.fps))
+        self._file.close()
+
+
+class LandmarkCache:
+    """Read-only memory-mapped view of a cache file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            magic, version, count, fps = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark cache")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported landmark cache version {version}")
+        self.path = path
+        self.fps = fps
+        self.count = count
+        if count:
+            self.landmarks = np.memmap(path, dtype=np.float32, mode='r', offset=HEADER_SIZE,
+                                       shape=(count,) + FRAME_SHAPE)
+            self.timestamps = np.memmap(path, dtype=np.float64, mode='r',
+                                        offset=HEADER_SIZE + count * FRAME_BYTES, shape=(count,))
+        else:
+            self.landmarks = np.empty((0,) + FRAME_SHAPE, dtype=np.float32)
+            self.timestamps = np.empty(0, dtype=np.float64)
+
+    def __len__(self):
+        return self.count
+
+    def detected(self):
+        """Boolean mask of frames with a pose"""
+        return ~np.isnan(self.landmarks[:, 0, 0])
@@ -0,0 +1,98 @@
+import struct
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# MediaPipe Pose landmark indices (mp.solutions.pose.PoseLandmark)
+NOSE = 0
+LEFT_EYE_INNER = 1
+LEFT_EYE = 2
+LEFT_EYE_OUTER = 3
+RIGHT_EYE_INNER = 4
+RIGHT_EYE = 5
+RIGHT_EYE_OUTER = 6
+LEFT_EAR = 7
+RIGHT_EAR = 8
+MOUTH_LEFT = 9
+MOUTH_RIGHT = 10
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_ELBOW = 13
+RIGHT_ELBOW = 14
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+LEFT_PINKY = 17
+RIGHT_PINKY = 18
+LEFT_INDEX = 19
+RIGHT_INDEX = 20
+LEFT_THUMB = 21
+RIGHT_THUMB = 22
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_KNEE = 25
+RIGHT_KNEE = 26
+LEFT_ANKLE = 27
+RIGHT_ANKLE = 28
+LEFT_HEEL = 29
+RIGHT_HEEL = 30
+LEFT_FOOT_INDEX = 31
+RIGHT_FOOT_INDEX = 32
+
+
+# Serialized, a landmark list whose landmarks carry exactly x, y, z and
+# visibility is 33 records of 22 bytes: a length-delimited field header
+# (0x0a, 20), then four little-endian fixed32 fields tagged 0x0d, 0x15, 0x1d
+# and 0x25. MediaPipe Pose output always has this shape.
+_RECORD_SIZE = 22
+_RECORDS = struct.Struct('<' + '3xf1xf1xf1xf' * NUM_LANDMARKS)
+_TAGS = tuple((offset, bytes([tag]) * NUM_LANDMARKS)
+              for offset, tag in zip((0, 1, 2, 7, 12, 17), (0x0a, 20, 0x0d, 0x15, 0x1d, 0x25)))
+
+
+def landmarks_to_array(pose_landmarks, out=None):
+    """Copy a MediaPipe landmark list into a (33, 4) float32 array of x, y, z, visibility.
+
+    This is the one place landmarks leave protobuf. Rather than reading 132
+    attributes, the list is serialized in C and the floats are unpacked from
+    the fixed-layout bytes in one call; any other layout falls back to
+    attribute access.
+    """
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    wire = pose_landmarks.SerializeToString()
+    if len(wire) == NUM_LANDMARKS * _RECORD_SIZE and all(wire[offset::_RECORD_SIZE] == tags for offset, tags in _TAGS):
+        out.reshape(-1)[:] = _RECORDS.unpack(wire)
+    else:
+        out[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark]
+    return out
+
+
+# MoveNet and other COCO-17 keypoint models, in their order, as MediaPipe indices
+COCO_KEYPOINTS = (
+    NOSE, LEFT_EYE, RIGHT_EYE, LEFT_EAR, RIGHT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER,
+    LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST, LEFT_HIP, RIGHT_HIP,
+    LEFT_KNEE, RIGHT_KNEE, LEFT_ANKLE, RIGHT_ANKLE
+)
+
+# Keypoints per frame for each layout accepted from clients
+LAYOUTS = {'mediapipe': NUM_LANDMARKS, 'coco': len(COCO_KEYPOINTS)}
+
+
+def decode_landmark_batch(buffer, layout='mediapipe'):
+    """Turn little-endian float16 (N, K, 4) client landmarks into an (N, 33, 4) float32 batch.
+
+    Values are x, y, z, visibility with x and y normalised to the image, in
+    the layout's keypoint order; a frame without a pose is all NaN. COCO
+    keypoints fill their MediaPipe slots and leave the rest NaN. Returns None
+    if the buffer is not a whole number of frames.
+    """
+    frame_bytes = LAYOUTS[layout] * 4 * 2
+    if not buffer or len(buffer) % frame_bytes:
+        return None
+    batch = np.frombuffer(buffer, dtype='<f2').reshape(-1, LAYOUTS[layout], 4)
+    if layout == 'mediapipe':
+        return batch.astype(np.float32)
+    landmarks = np.full((len(batch), NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    landmarks[:, COCO_KEYPOINTS] = batch
+    return landmarks
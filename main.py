@@ -1,211 +1,862 @@
-from flask import Flask, request, jsonify
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+import time
+
+# Startup timings are measured from here and reported by /health
+IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify
 import cv2
-import numpy as np
+import atexit
 import base64
-import mediapipe as mp
 import os
 import logging
 import datetime
+import json
+import math
+import multiprocessing
+import threading
+import numpy as np
 from flask_cors import CORS
+from flask_sock import Sock
+from simple_websocket import ConnectionClosed
+from werkzeug.exceptions import RequestEntityTooLarge
+from admission import AdmissionController
+from buffers import BufferPool, read_into
+from angles import joint_angles
+from events import EventChannel, format_event
+from exercises import EXERCISES, FINISH
+from frame_skip import FrameSkipper, MODES as FRAME_SKIP_MODES, skip_interval
+from frames import decode_image, jpeg_size, synthetic_person
+from history import LandmarkHistory
+from landmarks import LAYOUTS as LANDMARK_LAYOUTS, NUM_LANDMARKS, decode_landmark_batch
+from metrics import (
+    BASE64_SECONDS, ENCODE_SECONDS, ERRORS, FRAMES, IMDECODE_SECONDS, IN_FLIGHT, INFERENCE_PIXELS, LANDMARK_FRAMES,
+    NO_LANDMARK_FRAMES, RATE_LIMITED, RULES_SECONDS, SHED, registry
+)
+from pose_pool import PosePool, PoolTimeout
+from ratelimit import TokenBucketLimiter
+from inference_workers import ProcessPoseBackend
+from resolution import ResolutionPolicy
+from roi import RoiTracker
+from sessions import ExerciseState, Session, SessionStore
+from smoothing import OneEuroFilter, smooth_sequence
+from streaming import LatestSlot, RateMeter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
-
-# Initialize rate limiter
-limiter = Limiter(
-    get_remote_address,
-    app=app,
-    default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
+# FLASK_* environment variables, e.g. FLASK_RATELIMIT_ENABLED=false for load tests
+app.config.from_prefixed_env()
+# Frames are well under this; FLASK_MAX_CONTENT_LENGTH overrides it
+if app.config.get('MAX_CONTENT_LENGTH') is None:
+    app.config['MAX_CONTENT_LENGTH'] = 16 << 20
+# Enable CORS for all routes; the dashboard reads Retry-After from shed frames
+CORS(app, expose_headers=['Retry-After'])
+sock = Sock(app)
+
+# Token-bucket rate limits: frames per session and per client address, and
+# control requests (/health, opening a /stream) per address. Buckets allow a
+# one-second burst and are refilled continuously, so steady streaming at the
+# frame rate is never cut off.
+RATE_LIMIT_ENABLED = app.config.get('RATELIMIT_ENABLED', True)
+FRAME_RATE_PER_SESSION = float(os.environ.get('FRAME_RATE_PER_SESSION', 30))
+FRAME_RATE_PER_ADDRESS = float(os.environ.get('FRAME_RATE_PER_ADDRESS', 120))
+CONTROL_RATE_PER_ADDRESS = float(os.environ.get('CONTROL_RATE_PER_ADDRESS', 5))
+
+session_frame_limiter = TokenBucketLimiter(FRAME_RATE_PER_SESSION, burst=FRAME_RATE_PER_SESSION)
+address_frame_limiter = TokenBucketLimiter(FRAME_RATE_PER_ADDRESS, burst=FRAME_RATE_PER_ADDRESS)
+control_limiter = TokenBucketLimiter(CONTROL_RATE_PER_ADDRESS, burst=4 * CONTROL_RATE_PER_ADDRESS)
+
+def rate_limit(limiter, key):
+    """None if key may proceed, otherwise a 429 response"""
+    if not RATE_LIMIT_ENABLED:
+        return None
+    wait = limiter.hit(key)
+    if not wait:
+        return None
+    RATE_LIMITED.inc()
+    return jsonify({'error': 'Too many requests'}), 429, {'Retry-After': str(math.ceil(wait))}
+
+POSE_OPTIONS = {'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5}
+
+# MediaPipe takes about a second to import and a Pose graph pays one-off
+# initialisation on its first frames, so neither happens during this import.
+# POSE_STARTUP picks when they do:
+#   background  build and warm up on a thread once the import is done (default)
+#   preload     import MediaPipe now but build nothing, for servers that fork
+#               workers after loading the app; each worker starts on its first
+#               request, or from a post-fork hook calling start_inference()
+#   blocking    build and warm up before the import returns
+POSE_STARTUP = os.environ.get('POSE_STARTUP', 'background')
+POSE_WARMUP = os.environ.get('POSE_WARMUP', '1') != '0'
+
+def create_pose():
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(**POSE_OPTIONS)
+
+POSE_POOL_SIZE = int(os.environ.get('POSE_POOL_SIZE', os.cpu_count() or 1))
+
+def create_pose_backend():
+    size = POSE_POOL_SIZE
+    timeout = float(os.environ.get('POSE_CHECKOUT_TIMEOUT', 2.0))
+    if os.environ.get('INFERENCE_BACKEND') == 'processes':
+        # Sidesteps the GIL: one Pose graph per worker process. Frames can be
+        # sent to the workers in micro-batches collected for POSE_BATCH_WAIT_MS
+        backend = ProcessPoseBackend(size, timeout=timeout, pose_options=POSE_OPTIONS,
+                                     max_batch=int(os.environ.get('POSE_MAX_BATCH', 8)),
+                                     batch_wait=float(os.environ.get('POSE_BATCH_WAIT_MS', 0)) / 1000)
+        atexit.register(backend.close)
+        return backend
+    # A Pose graph is not safe to call from several threads at once, so request
+    # threads check one out of a pool sized to the machine
+    return PosePool(create_pose, size=size, timeout=timeout)
+
+pose_backend = None
+startup = {
+    'state': 'cold',
+    'import_seconds': None,
+    'build_seconds': None,
+    'warm_up_seconds': None,
+    'ready_seconds': None,
+    'error': None
+}
+_startup_lock = threading.Lock()
+_startup_done = threading.Event()
+
+def warm_up(backend):
+    """Push synthetic frames through decoding, inference and the rep rules"""
+    person = decode_image(cv2.imencode('.jpg', synthetic_person())[1])
+    # The figure runs both the detector and the landmark model; the blank
+    # frame then drops the tracking state it left behind
+    backend.warm_up([person, person, np.zeros_like(person)])
+    landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    for exercise in EXERCISES.values():
+        exercise.update(ExerciseState(), landmarks, joint_angles(landmarks))
+
+def start_inference(background=True):
+    """Build and warm up the pose backend once; later calls only wait for it if blocking"""
+    with _startup_lock:
+        starting = startup['state'] == 'cold'
+        if starting:
+            startup['state'] = 'warming'
+    if starting and background:
+        threading.Thread(target=_start_inference, name='pose-startup', daemon=True).start()
+    elif starting:
+        _start_inference()
+    elif not background:
+        _startup_done.wait()
+
+def _start_inference():
+    global pose_backend
+    try:
+        start = time.perf_counter()
+        backend = create_pose_backend()
+        startup['build_seconds'] = time.perf_counter() - start
+        if POSE_WARMUP:
+            start = time.perf_counter()
+            warm_up(backend)
+            startup['warm_up_seconds'] = time.perf_counter() - start
+        pose_backend = backend
+        startup['ready_seconds'] = time.perf_counter() - IMPORT_STARTED
+        startup['state'] = 'ready'
+        logger.info(f"Pose backend ready {startup['ready_seconds']:.2f}s after import started "
+                    f"(import {startup['import_seconds'] or 0:.2f}s, build {startup['build_seconds']:.2f}s, "
+                    f"warm-up {startup['warm_up_seconds'] or 0:.2f}s)")
+    except Exception as e:
+        startup['state'] = 'failed'
+        startup['error'] = str(e)
+        logger.error(f"Pose backend failed to start: {e}", exc_info=True)
+    finally:
+        _startup_done.set()
+
+def inference_ready():
+    if startup['state'] == 'ready':
+        return True
+    # Preloaded workers start on their first request
+    start_inference()
+    return False
+
+EXERCISE_TYPES = tuple(EXERCISES)
+
+# Exercise state tracking, one entry per client session
+sessions = SessionStore(
+    max_sessions=int(os.environ.get('MAX_SESSIONS', 50000)),
+    ttl=float(os.environ.get('SESSION_TTL_SECONDS', 600))
 )
 
-# Initialize MediaPipe Pose
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+registry.gauge('pose_server_live_sessions', 'Sessions currently held in memory', callback=lambda: len(sessions))
 
-def calculate_angle(a, b, c):
-    a = np.array(a)
-    b = np.array(b)
-    c = np.array(c)
+# Load shedding: at most MAX_IN_FLIGHT frames in decoding and inference at
+# once, fewer while the p95 latency of admitted frames is over LATENCY_SLO_MS.
+# Frames over the limit get an immediate 503 instead of queueing.
+admission = AdmissionController(
+    max_in_flight=int(os.environ.get('MAX_IN_FLIGHT', 2 * POSE_POOL_SIZE)),
+    latency_slo=float(os.environ.get('LATENCY_SLO_MS', 250)) / 1000
+)
 
-    ba = a - b
-    bc = c - b
+registry.gauge('pose_server_admission_limit', 'Frames currently allowed in flight', callback=lambda: admission.limit)
 
-    cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-    angle = np.degrees(np.arccos(np.clip(cosine_angle, -1.0, 1.0)))
-    return angle
+MAX_SESSION_ID_LENGTH = 128
 
-# Exercise state tracking
-exercise_states = {
-    'Pushups': {'stage': None, 'reps': 0},
-    'Squats': {'stage': None, 'reps': 0},
-    'Bicep Curls': {'stage': None, 'reps': 0}
+# Uploaded frames are decoded at reduced size, adapting per session to the
+# measured inference latency
+RESOLUTION_OPTIONS = {
+    'target_height': int(os.environ.get('FRAME_TARGET_HEIGHT', 480)),
+    'min_height': int(os.environ.get('FRAME_MIN_HEIGHT', 256)),
+    'budget': float(os.environ.get('INFERENCE_BUDGET_MS', 50)) / 1000
 }
 
-def process_frame(frame, exercise_type):
+def get_session_id(data):
+    session_id = data.get('session_id') or request.headers.get('X-Session-ID')
+    if not session_id:
+        # Clients that predate sessions are keyed by address
+        return request.remote_addr
+    return str(session_id)[:MAX_SESSION_ID_LENGTH]
+
+# With ROI_CROP=on, frames are cropped to the box around the session's last
+# pose before colour conversion and inference
+ROI_CROP = os.environ.get('ROI_CROP', 'off') == 'on'
+
+# Sessions can skip inference on some frames and extrapolate landmarks instead
+FRAME_SKIP_MODE = os.environ.get('FRAME_SKIP_MODE', 'off')
+MAX_SKIP_INTERVAL = int(os.environ.get('MAX_SKIP_INTERVAL', 4))
+
+# Landmarks are smoothed per session with a One Euro filter before the rep
+# rules see them, so jitter near a threshold cannot add or drop reps.
+# batch.py and replay.py apply the same filter with the same defaults
+LANDMARK_SMOOTHING = os.environ.get('LANDMARK_SMOOTHING', 'one_euro') != 'off'
+SMOOTHING_OPTIONS = {
+    'min_cutoff': float(os.environ.get('SMOOTHING_MIN_CUTOFF', 1.0)),
+    'beta': float(os.environ.get('SMOOTHING_BETA', 10.0))
+}
+
+# With LANDMARK_HISTORY_FRAMES above 0, each session keeps its last frames of
+# landmarks, angles and timestamps in a preallocated ring buffer for windowed
+# analytics. Off by default: nothing in the server reads it yet
+LANDMARK_HISTORY_FRAMES = int(os.environ.get('LANDMARK_HISTORY_FRAMES', 0))
+
+def configure_frame_skip(session, mode):
+    mode = mode or FRAME_SKIP_MODE
+    if mode == 'off':
+        session.frame_skip = None
+    elif session.frame_skip is None or session.frame_skip.mode != mode:
+        session.frame_skip = FrameSkipper(mode, max_interval=MAX_SKIP_INTERVAL)
+
+def decode_frame(frame_buffer, session):
+    if session.resolution is None:
+        session.resolution = ResolutionPolicy(**RESOLUTION_OPTIONS)
+    size = jpeg_size(frame_buffer)
+    scale = session.resolution.choose(size[1]) if size else 1
+    start = time.perf_counter()
+    frame = decode_image(frame_buffer, scale)
+    IMDECODE_SECONDS.observe(time.perf_counter() - start)
+    return frame
+
+def publish_stage(events, exercise, exercise_type, stage_index, reps, completed):
+    events.publish('rep' if completed else 'stage', {
+        'exercise_type': exercise_type,
+        'reps': reps,
+        'stage': exercise.stages[stage_index]
+    })
+
+def process_frame(frame, exercise_type, session):
+    exercise = EXERCISES[exercise_type]
+    state = session.state(exercise_type)
+    FRAMES.inc()
     try:
-        # Convert frame to RGB
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image.flags.writeable = False
-
-        # Process with MediaPipe Pose
-        results = pose.process(image)
-
-        if not results.pose_landmarks:
-            logger.warning("No pose landmarks detected")
-            return {'reps': exercise_states[exercise_type]['reps']}
-
-        landmarks = results.pose_landmarks.landmark
-        logger.debug(f"Processing frame for {exercise_type}")
-
-        if exercise_type == 'Pushups':
-            # Pushup logic
-            left_shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-            left_elbow = [landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].x,
-                         landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-            angle = calculate_angle(left_shoulder, left_elbow, [left_elbow[0], left_elbow[1] - 0.1])
-            
-            if angle > 100 and exercise_states[exercise_type]['stage'] != 'up':
-                exercise_states[exercise_type]['stage'] = 'up'
-                logger.debug("Pushup up position detected")
-                
-            if angle < 55 and exercise_states[exercise_type]['stage'] == 'up':
-                exercise_states[exercise_type]['stage'] = 'down'
-                exercise_states[exercise_type]['reps'] += 1
-                logger.info(f"Pushup completed! Total reps: {exercise_states[exercise_type]['reps']}")
-                
-            return {'reps': exercise_states[exercise_type]['reps'], 'stage': exercise_states[exercise_type]['stage']}
-
-        elif exercise_type == 'Squats':
-            # Squat logic
-            left_hip = [landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                       landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y]
-            left_knee = [landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].x,
-                        landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].y]
-            left_ankle = [landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].x,
-                         landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].y]
-            angle = calculate_angle(left_hip, left_knee, left_ankle)
-            
-            if angle > 150 and exercise_states[exercise_type]['stage'] != 'up':
-                exercise_states[exercise_type]['stage'] = 'up'
-                logger.debug("Squat up position detected")
-                
-            if angle < 110 and exercise_states[exercise_type]['stage'] == 'up':
-                exercise_states[exercise_type]['stage'] = 'down'
-                exercise_states[exercise_type]['reps'] += 1
-                logger.info(f"Squat completed! Total reps: {exercise_states[exercise_type]['reps']}")
-                
-            return {'reps': exercise_states[exercise_type]['reps'], 'stage': exercise_states[exercise_type]['stage']}
-
-        elif exercise_type == 'Bicep Curls':
-            # Bicep curl logic
-            left_shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-            left_elbow = [landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].x,
-                         landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-            left_wrist = [landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x,
-                         landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y]
-            angle = calculate_angle(left_shoulder, left_elbow, left_wrist)
-            
-            if angle > 160 and exercise_states[exercise_type]['stage'] != 'down':
-                exercise_states[exercise_type]['stage'] = 'down'
-                logger.debug("Bicep curl down position detected")
-                
-            if angle < 30 and exercise_states[exercise_type]['stage'] == 'down':
-                exercise_states[exercise_type]['stage'] = 'up'
-                exercise_states[exercise_type]['reps'] += 1
-                logger.info(f"Bicep curl completed! Total reps: {exercise_states[exercise_type]['reps']}")
-                
-            return {'reps': exercise_states[exercise_type]['reps'], 'stage': exercise_states[exercise_type]['stage']}
+        now = time.monotonic()
+        skipper = session.frame_skip
+        if skipper is not None and not skipper.should_infer(frame, now, skip_interval(pose_backend.load(), MAX_SKIP_INTERVAL)):
+            landmarks = skipper.predict(now)
+        else:
+            # Process with MediaPipe Pose
+            start = time.perf_counter()
+            IN_FLIGHT.inc()
+            try:
+                if ROI_CROP:
+                    if session.roi is None:
+                        session.roi = RoiTracker()
+                    image = session.roi.crop(frame)
+                    INFERENCE_PIXELS.inc(image.shape[0] * image.shape[1])
+                    try:
+                        detected = pose_backend.detect(session, image)
+                    except Exception:
+                        session.roi.reset()
+                        raise
+                    landmarks = session.roi.update(detected, frame.shape)
+                else:
+                    INFERENCE_PIXELS.inc(frame.shape[0] * frame.shape[1])
+                    landmarks = pose_backend.detect(session, frame)
+            finally:
+                IN_FLIGHT.dec()
+            if session.resolution is not None:
+                session.resolution.observe(time.perf_counter() - start)
+            if skipper is not None:
+                skipper.record(frame, landmarks, now)
 
-        return {'reps': 0}
+        events = session.events
+        if events is not None:
+            events.pose_seen(landmarks is not None)
+        if landmarks is None:
+            NO_LANDMARK_FRAMES.inc()
+            logger.debug("No pose landmarks detected")
+            return {'reps': state.reps}
+        if LANDMARK_SMOOTHING:
+            if session.smoothing is None:
+                session.smoothing = OneEuroFilter(**SMOOTHING_OPTIONS)
+            landmarks = session.smoothing.filter(landmarks, now)
+
+        start = time.perf_counter()
+        stage_index = state.stage_index
+        angles = joint_angles(landmarks)
+        completed = exercise.update(state, landmarks, angles, now)
+        RULES_SECONDS.observe(time.perf_counter() - start)
+        if LANDMARK_HISTORY_FRAMES:
+            if session.history is None:
+                session.history = LandmarkHistory(LANDMARK_HISTORY_FRAMES)
+            session.history.append(landmarks, angles, now)
+
+        if completed:
+            logger.info(f"{exercise_type} rep completed! Total reps: {state.reps}")
+        if events is not None and state.stage_index != stage_index:
+            publish_stage(events, exercise, exercise_type, state.stage_index, state.reps, completed)
 
+        result = {'reps': state.reps, 'stage': exercise.stage_name(state)}
+        rep_metrics = state.metrics.closed
+        if rep_metrics is not None:
+            result['rep_metrics'] = rep_metrics
+            if events is not None:
+                events.publish('rep_metrics', dict(rep_metrics, exercise_type=exercise_type))
+        return result
+
+    except PoolTimeout:
+        raise
     except Exception as e:
-        print(f"Error processing frame: {e}")
+        ERRORS.inc()
+        logger.error(f"Error processing frame: {e}")
         return {'reps': 0}
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    limited = rate_limit(control_limiter, request.remote_addr)
+    if limited:
+        return limited
     print("Server is running and healthy")
+    # Liveness is the 200; readiness is 'warming' until the pose backend has
+    # been built and warmed up
     return jsonify({
         'status': 'healthy',
         'message': 'Server is running successfully',
+        'readiness': startup['state'],
+        'startup': startup,
+        'inference': pose_backend.stats() if pose_backend else None,
+        'admission': admission.stats(),
         'timestamp': datetime.datetime.now().isoformat()
     }), 200
 
+FRAME_CONTENT_TYPES = ('image/jpeg', 'image/png', 'application/octet-stream')
+
+# Raw frame uploads are read into pooled buffers instead of fresh bytes;
+# bodies over the pool's 4 MB cap get a one-off buffer
+body_buffers = BufferPool(per_key=8)
+
+def read_frame_upload():
+    """Return (params, encoded image buffer, pooled buffer or None) for a JSON, raw or multipart upload"""
+    if request.mimetype == 'application/json':
+        data = request.get_json(silent=True)
+        if not data or 'frame' not in data:
+            return data, None, None
+        start = time.perf_counter()
+        frame_buffer = base64.b64decode(data['frame'])
+        BASE64_SECONDS.observe(time.perf_counter() - start)
+        return data, frame_buffer, None
+
+    # Binary uploads carry their parameters in the query string or headers
+    params = {
+        'exercise_type': request.args.get('exercise_type') or request.headers.get('X-Exercise-Type'),
+        'session_id': request.args.get('session_id') or request.headers.get('X-Session-ID'),
+        'frame_skip': request.args.get('frame_skip'),
+        'ack': request.args.get('ack')
+    }
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('frame')
+        return params, upload.read() if upload else None, None
+    if request.mimetype in FRAME_CONTENT_TYPES:
+        length = request.content_length
+        if not length:
+            # Chunked upload of unknown size
+            return params, request.get_data(cache=False), None
+        pooled, frame_buffer = read_into(request.stream, length, body_buffers)
+        return params, frame_buffer, pooled
+    return params, None, None
+
 @app.route('/process_frame', methods=['POST'])
-@limiter.limit("10 per second")
 def process_frame_endpoint():
+    limited = rate_limit(address_frame_limiter, request.remote_addr)
+    if limited:
+        return limited
+    if not inference_ready():
+        if startup['state'] == 'failed':
+            # Retrying will not help until the server is restarted
+            return jsonify({'error': 'Pose backend unavailable'}), 503
+        return jsonify({'error': 'Warming up'}), 503, {'Retry-After': '1'}
+    return handle_frame_upload()
+
+def handle_frame_upload():
+    pooled = None
     try:
-        print("Received frame processing request")
-        data = request.json
-        if not data or 'frame' not in data or 'exercise_type' not in data:
+        data, frame_buffer, pooled = read_frame_upload()
+        if not data or frame_buffer is None or not len(frame_buffer) or not data.get('exercise_type'):
             logger.warning("Invalid request data")
             return jsonify({'error': 'Invalid request data'}), 400
 
-        frame_data = data['frame']
         exercise_type = data['exercise_type']
 
-        if exercise_type not in ['Pushups', 'Squats', 'Bicep Curls']:
+        if exercise_type not in EXERCISE_TYPES:
             logger.warning(f"Invalid exercise type: {exercise_type}")
             return jsonify({'error': 'Invalid exercise type'}), 400
 
-        # Decode base64 frame
-        frame_bytes = base64.b64decode(frame_data)
-        frame_array = np.frombuffer(frame_bytes, dtype=np.uint8)
-        frame = cv2.imdecode(frame_array, flags=cv2.IMREAD_COLOR)
+        frame_skip = data.get('frame_skip') or request.headers.get('X-Frame-Skip')
+        if frame_skip and frame_skip not in FRAME_SKIP_MODES:
+            logger.warning(f"Invalid frame skip mode: {frame_skip}")
+            return jsonify({'error': 'Invalid frame skip mode'}), 400
 
-        # Process frame with AI model
-        result = process_frame(frame, exercise_type)
+        session_id = get_session_id(data)
+        limited = rate_limit(session_frame_limiter, session_id)
+        if limited:
+            return limited
+        session = sessions.get(session_id)
+        configure_frame_skip(session, frame_skip)
 
-        logger.info(f"Successfully processed frame for {exercise_type}")
-        return jsonify(result)
+        # Only frames that get as far as decoding are admitted, so cheap
+        # rejections above do not count towards the latency the limit follows
+        if not admission.try_acquire():
+            SHED.inc()
+            return jsonify({'error': 'Server busy'}), 503, {'Retry-After': str(admission.retry_after())}
+        start = time.perf_counter()
+        try:
+            frame = decode_frame(frame_buffer, session)
+            if frame is None:
+                logger.warning("Could not decode frame")
+                return jsonify({'error': 'Invalid image data'}), 400
+
+            # Process frame with AI model
+            result = process_frame(frame, exercise_type, session)
+        finally:
+            admission.release(time.perf_counter() - start)
+
+        logger.debug(f"Successfully processed frame for {exercise_type}")
+        if data.get('ack') == 'none':
+            # The client follows /events/<session_id> instead
+            return '', 204
+        start = time.perf_counter()
+        response = jsonify(result)
+        ENCODE_SECONDS.observe(time.perf_counter() - start)
+        return response
+    except PoolTimeout as e:
+        logger.warning(f"Pose pool exhausted: {e}")
+        return jsonify({'error': 'Server busy'}), 503, {'Retry-After': '1'}
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'Frame too large'}), 413
     except Exception as e:
+        ERRORS.inc()
         logger.error(f"Error processing frame: {str(e)}", exc_info=True)
         return jsonify({'error': 'Internal server error'}), 500
+    finally:
+        if pooled is not None:
+            body_buffers.release(pooled)
+
+# Frames per /landmarks request; at 264 bytes each this caps a body at about 1 MB
+MAX_LANDMARK_BATCH = int(os.environ.get('MAX_LANDMARK_BATCH', 4096))
+
+@app.route('/landmarks', methods=['POST'])
+def landmarks_endpoint():
+    """Count reps from landmarks detected on the client: no decoding or inference here"""
+    limited = rate_limit(address_frame_limiter, request.remote_addr)
+    if limited:
+        return limited
+    exercise_type = request.args.get('exercise_type') or request.headers.get('X-Exercise-Type')
+    if exercise_type not in EXERCISE_TYPES:
+        logger.warning(f"Invalid exercise type: {exercise_type}")
+        return jsonify({'error': 'Invalid exercise type'}), 400
+    layout = request.args.get('layout', 'mediapipe')
+    if layout not in LANDMARK_LAYOUTS:
+        return jsonify({'error': 'Invalid landmark layout'}), 400
+    if request.content_length and request.content_length > MAX_LANDMARK_BATCH * LANDMARK_LAYOUTS[layout] * 8:
+        return jsonify({'error': 'Too many frames'}), 413
+
+    session_id = get_session_id(request.args)
+    limited = rate_limit(session_frame_limiter, session_id)
+    if limited:
+        return limited
+    landmarks = decode_landmark_batch(request.get_data(cache=False), layout)
+    if landmarks is None:
+        return jsonify({'error': 'Invalid landmark data'}), 400
+
+    try:
+        fps = float(request.args.get('fps', 30))
+    except ValueError:
+        fps = 0.0
+    if not 0 < fps <= 1000:
+        return jsonify({'error': 'Invalid fps'}), 400
+
+    session = sessions.get(session_id)
+    exercise = EXERCISES[exercise_type]
+    state = session.state(exercise_type)
+    LANDMARK_FRAMES.inc(len(landmarks))
+    if LANDMARK_SMOOTHING:
+        # Same filter as uploaded frames; a batch's frames are taken to be
+        # 1/fps apart and to end now
+        if session.smoothing is None:
+            session.smoothing = OneEuroFilter(**SMOOTHING_OPTIONS)
+        timestamps = time.monotonic() - np.arange(len(landmarks) - 1, -1, -1) / fps
+        landmarks = smooth_sequence(landmarks, timestamps, session.smoothing)
+    stage_index = state.stage_index
+    start = time.perf_counter()
+    stages, reps = exercise.advance(state, landmarks)
+    RULES_SECONDS.observe(time.perf_counter() - start)
+
+    events = session.events
+    if events is not None:
+        # Replay the batch's changes in frame order
+        detected = ~np.isnan(landmarks[:, :, 1]).all(axis=1)
+        for seen, stage, count in zip(detected.tolist(), stages.tolist(), reps.tolist()):
+            events.pose_seen(seen)
+            if stage != stage_index:
+                publish_stage(events, exercise, exercise_type, stage, count, stage == FINISH)
+                stage_index = stage
+
+    if request.args.get('ack') == 'none':
+        return '', 204
+    return jsonify({'reps': state.reps, 'stage': exercise.stage_name(state)})
+
+SSE_KEEPALIVE_SECONDS = 15
+
+@app.route('/events/<session_id>', methods=['GET'])
+def session_events(session_id):
+    """Server-sent events for one session: rep, stage and warning changes"""
+    limited = rate_limit(control_limiter, request.remote_addr)
+    if limited:
+        return limited
+    session = sessions.get(session_id[:MAX_SESSION_ID_LENGTH])
+    if session.events is None:
+        session.events = EventChannel()
+    channel = session.events
+    try:
+        last_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_id = 0
+    # Ids restart when the session was evicted and recreated
+    last_id = min(last_id, channel.last_id)
+    snapshot = {exercise_type: state.reps for exercise_type, state in session.states.items()}
+
+    def stream():
+        yield format_event(None, 'state', {'reps': snapshot})
+        after = last_id
+        while True:
+            events = channel.wait(after, SSE_KEEPALIVE_SECONDS)
+            if not events:
+                if sessions.peek(session.session_id) is not session:
+                    # Evicted; the client reconnects and gets a fresh channel
+                    return
+                yield ': keepalive\n\n'
+                continue
+            for event in events:
+                yield format_event(*event)
+            after = events[-1][0]
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+def read_stream(ws, frames, params):
+    """Receive loop for /stream: binary messages are frames, text messages are JSON controls"""
+    seq = 0
+    try:
+        while True:
+            message = ws.receive()
+            if isinstance(message, str):
+                try:
+                    control = json.loads(message)
+                except ValueError:
+                    logger.debug("Ignoring malformed stream control message")
+                    continue
+                # Anything but an object naming a known exercise is ignored
+                if isinstance(control, dict) and control.get('exercise_type') in EXERCISE_TYPES:
+                    params['exercise_type'] = control['exercise_type']
+            else:
+                seq += 1
+                frames.put((seq, message))
+    except ConnectionClosed as e:
+        logger.debug(f"Stream reader stopped: {e}")
+    finally:
+        frames.close()
+
+@sock.route('/stream')
+def stream(ws):
+    params = {
+        'exercise_type': request.args.get('exercise_type', 'Pushups'),
+        'session_id': get_session_id(request.args)
+    }
+    if params['exercise_type'] not in EXERCISE_TYPES:
+        ws.close(reason=1008, message='Invalid exercise type')
+        return
+    if RATE_LIMIT_ENABLED and control_limiter.hit(request.remote_addr):
+        RATE_LIMITED.inc()
+        ws.close(reason=1008, message='Too many requests')
+        return
+    if not inference_ready():
+        if startup['state'] == 'failed':
+            ws.close(reason=1011, message='Pose backend unavailable')
+        else:
+            ws.close(reason=1013, message='Warming up')
+        return
+    frame_skip = request.args.get('frame_skip')
+    if frame_skip and frame_skip not in FRAME_SKIP_MODES:
+        ws.close(reason=1008, message='Invalid frame skip mode')
+        return
+    configure_frame_skip(sessions.get(params['session_id']), frame_skip)
+
+    # Frames arriving while inference is busy overwrite each other, so a
+    # slow connection skips ahead instead of building up latency
+    frames = LatestSlot()
+    reader = threading.Thread(target=read_stream, args=(ws, frames, params), daemon=True)
+    reader.start()
+
+    shed = 0
+    try:
+        while True:
+            item = frames.get()
+            if item is None:
+                break
+            seq, frame_buffer = item
+            if not admission.try_acquire():
+                SHED.inc()
+                shed += 1
+                continue
+            start = time.perf_counter()
+            try:
+                session = sessions.get(params['session_id'])
+                frame = decode_frame(frame_buffer, session)
+                result = process_frame(frame, params['exercise_type'], session) if frame is not None else None
+            except PoolTimeout:
+                result = None
+            finally:
+                admission.release(time.perf_counter() - start)
+            if result is None:
+                continue
+
+            start = time.perf_counter()
+            event = {
+                'f': seq,
+                'r': result['reps'],
+                's': result.get('stage'),
+                'd': frames.dropped + shed
+            }
+            if 'rep_metrics' in result:
+                event['m'] = result['rep_metrics']
+            event = json.dumps(event, separators=(',', ':'))
+            ENCODE_SECONDS.observe(time.perf_counter() - start)
+            ws.send(event)
+    except ConnectionClosed:
+        pass
+    finally:
+        frames.close()
+    logger.info(f"Stream closed for session {params['session_id']}: "
+                f"{frames.put_count} frames received, {frames.dropped} dropped, {shed} shed")
+
+WEBCAM_KEYS = {ord('p'): 'Pushups', ord('s'): 'Squats', ord('b'): 'Bicep Curls'}
+FPS_REPORT_SECONDS = 5.0
+
+def open_capture(source):
+    """A camera index or a video file path; digit strings are camera indices"""
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    return cv2.VideoCapture(source)
+
+def draw_overlay(frame, exercise_type, result, fps_line=None):
+    cv2.putText(frame, f"Exercise: {exercise_type}", (10, 30),
+               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    cv2.putText(frame, f"Reps: {result['reps']}", (10, 70),
+               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    if fps_line:
+        cv2.putText(frame, fps_line, (10, 105),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+
+def capture_frames(cap, frames, stop, meter, realtime):
+    """Capture stage: read as fast as the source allows and keep only the newest frame"""
+    # Files are paced to their frame rate so they behave like a camera
+    interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30.0) if realtime else 0.0
+    next_frame = time.monotonic()
+    try:
+        while not stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            meter.tick()
+            frames.put(frame)
+            if interval:
+                next_frame += interval
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        frames.close()
+
+def infer_frames(frames, results, params, session, meter):
+    """Inference stage: process the newest captured frame, hand it on with its result"""
+    try:
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+            exercise_type = params['exercise_type']
+            try:
+                result = process_frame(frame, exercise_type, session)
+            except PoolTimeout:
+                continue
+            meter.tick()
+            results.put((frame, exercise_type, result))
+    finally:
+        results.close()
+
+def webcam_interface(source=0, pipelined=True, display=True, exercise_type='Pushups'):
+    """Run rep counting on a camera (or a video file) and show the result.
+
+    In pipelined mode capture, inference and display run concurrently, joined
+    by single-slot handoffs that keep only the newest frame, so the camera is
+    never throttled by inference. Per-stage FPS is logged every few seconds
+    and returned at the end. display=False runs headless.
+    """
+    start_inference(background=False)
+    if startup['state'] != 'ready':
+        raise RuntimeError(f"Pose backend failed to start: {startup['error']}")
+    if not pipelined:
+        return webcam_serial(source, display, exercise_type)
+
+    cap = open_capture(source)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video source {source!r}")
+    session = Session('webcam')
+    params = {'exercise_type': exercise_type}
+    stop = threading.Event()
+    frames = LatestSlot()
+    results = LatestSlot()
+    meters = {'capture': RateMeter(), 'inference': RateMeter(), 'display': RateMeter()}
+    realtime = not isinstance(source, int) and not str(source).isdigit()
+
+    threads = [
+        threading.Thread(target=capture_frames, args=(cap, frames, stop, meters['capture'], realtime),
+                         name='webcam-capture', daemon=True),
+        threading.Thread(target=infer_frames, args=(frames, results, params, session, meters['inference']),
+                         name='webcam-inference', daemon=True)
+    ]
+    for thread in threads:
+        thread.start()
+    if display:
+        print("Press 'p' for Pushups, 's' for Squats, 'b' for Bicep Curls, 'q' to quit")
+
+    # Display stays on the calling thread, where GUI toolkits expect it
+    fps_line = None
+    next_report = time.monotonic() + FPS_REPORT_SECONDS
+    try:
+        while True:
+            item = results.get(timeout=0.05)
+            if item is None and results.closed:
+                break
+            if item is not None:
+                frame, frame_exercise, result = item
+                meters['display'].tick()
+                if display:
+                    draw_overlay(frame, frame_exercise, result, fps_line)
+                    cv2.imshow('Fitness Tracker', frame)
+            if display:
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                if key in WEBCAM_KEYS:
+                    params['exercise_type'] = WEBCAM_KEYS[key]
+
+            if time.monotonic() >= next_report:
+                next_report += FPS_REPORT_SECONDS
+                fps_line = ' '.join(f"{stage} {meter.rate():.1f}" for stage, meter in meters.items()) + ' fps'
+                logger.info(f"Webcam pipeline: {fps_line}, {frames.dropped} captured and "
+                            f"{results.dropped} inferred frames dropped")
+    finally:
+        stop.set()
+        frames.close()
+        for thread in threads:
+            thread.join(timeout=2)
+        cap.release()
+        if display:
+            cv2.destroyAllWindows()
+
+    report = {stage: round(meter.average(), 1) for stage, meter in meters.items()}
+    report.update({
+        'frames': meters['capture'].count,
+        'inferred': meters['inference'].count,
+        'capture_dropped': frames.dropped,
+        'display_dropped': results.dropped,
+        'reps': session.state(params['exercise_type']).reps
+    })
+    logger.info(f"Webcam pipeline finished: {report}")
+    return report
+
+def webcam_serial(source=0, display=True, exercise_type='Pushups'):
+    """Single loop that reads, infers and displays each frame in turn"""
+    cap = open_capture(source)
+    session = Session('webcam')
+    meter = RateMeter()
+    if display:
+        print("Press 'p' for Pushups, 's' for Squats, 'b' for Bicep Curls, 'q' to quit")
+    result = {'reps': 0}
 
-def webcam_interface():
-    cap = cv2.VideoCapture(0)
-    exercise_type = 'Pushups'  # Default exercise
-    print("Press 'p' for Pushups, 's' for Squats, 'b' for Bicep Curls, 'q' to quit")
-    
     while cap.isOpened():
         ret, frame = cap.read()
         if not ret:
             break
-            
+
         # Process frame
-        result = process_frame(frame, exercise_type)
-        
+        try:
+            result = process_frame(frame, exercise_type, session)
+        except PoolTimeout:
+            continue
+        meter.tick()
+        if not display:
+            continue
+
         # Display rep count
-        cv2.putText(frame, f"Exercise: {exercise_type}", (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"Reps: {result['reps']}", (10, 70), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        
+        draw_overlay(frame, exercise_type, result)
         cv2.imshow('Fitness Tracker', frame)
-        
-        # Handle key presses helklo hjcsa how are you
+
+        # Handle key presses
         key = cv2.waitKey(1) & 0xFF
         if key == ord('q'):
             break
-        elif key == ord('p'):
-            exercise_type = 'Pushups'
-        elif key == ord('s'):
-            exercise_type = 'Squats'
-        elif key == ord('b'):
-            exercise_type = 'Bicep Curls'
-    
+        elif key in WEBCAM_KEYS:
+            exercise_type = WEBCAM_KEYS[key]
+
     cap.release()
-    cv2.destroyAllWindows()
+    if display:
+        cv2.destroyAllWindows()
+    return {'frames': meter.count, 'fps': round(meter.average(), 1), 'reps': result['reps']}
+
+startup['import_seconds'] = time.perf_counter() - IMPORT_STARTED
+
+# Spawned inference workers re-import this module and must not start their own
+if multiprocessing.parent_process() is None:
+    if POSE_STARTUP == 'preload':
+        import mediapipe
+    elif POSE_STARTUP == 'blocking':
+        start_inference(background=False)
+    else:
+        start_inference()
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=3001)
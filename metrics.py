@@ -0,0 +1,158 @@
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=None):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        lock = self._lock
+        lock.acquire()
+        self.value += amount
+        lock.release()
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Gauge:
+    """A value that goes up and down, or is read from a callback at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labels=None, callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.callback = callback
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        lock = self._lock
+        lock.acquire()
+        self.value += amount
+        lock.release()
+
+    def dec(self, amount=1):
+        lock = self._lock
+        lock.acquire()
+        self.value -= amount
+        lock.release()
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self):
+        yield self.name, self.labels, self.callback() if self.callback else self.value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=None, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # One slot per bucket plus +Inf; counts are per bucket, summed at scrape time
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        # Explicit acquire/release is noticeably cheaper than a with block here
+        lock = self._lock
+        lock.acquire()
+        self._counts[index] += 1
+        self._sum += value
+        lock.release()
+
+    def samples(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        labels = self.labels or {}
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), counts):
+            cumulative += count
+            yield f'{self.name}_bucket', {**labels, 'le': bound}, cumulative
+        yield f'{self.name}_count', self.labels, cumulative
+        yield f'{self.name}_sum', self.labels, total
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labels=None):
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=None, callback=None):
+        return self.register(Gauge(name, documentation, labels, callback))
+
+    def histogram(self, name, documentation, labels=None, buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self):
+        """Prometheus text exposition format, one HELP/TYPE block per metric name"""
+        lines = []
+        described = set()
+        for metric in self._metrics:
+            if metric.name not in described:
+                described.add(metric.name)
+                lines.append(f'# HELP {metric.name} {metric.documentation}')
+                lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+FRAMES = registry.counter('pose_server_frames_total', 'Frames received for processing')
+NO_LANDMARK_FRAMES = registry.counter('pose_server_no_landmark_frames_total', 'Frames where no pose was detected')
+ERRORS = registry.counter('pose_server_frame_errors_total', 'Frames that failed with an error')
+RATE_LIMITED = registry.counter('pose_server_rate_limited_total', 'Requests rejected by the rate limiter')
+LANDMARK_FRAMES = registry.counter('pose_server_landmark_frames_total', 'Client-detected landmark frames received')
+INFERENCE_PIXELS = registry.counter('pose_server_inference_pixels_total', 'Pixels handed to pose inference')
+SHED = registry.counter('pose_server_shed_total', 'Frames rejected by admission control')
+IN_FLIGHT = registry.gauge('pose_server_inference_in_flight', 'Frames waiting for or running pose inference')
+
+
+def _stage(name):
+    return registry.histogram('pose_server_stage_seconds', 'Time spent per frame in each processing stage',
+                              labels={'stage': name})
+
+
+BASE64_SECONDS = _stage('base64_decode')
+IMDECODE_SECONDS = _stage('imdecode')
+COLOR_SECONDS = _stage('color_convert')
+INFERENCE_SECONDS = _stage('pose_process')
+RULES_SECONDS = _stage('rules')
+ENCODE_SECONDS = _stage('json_encode')
+
+BATCH_SIZE = registry.histogram('pose_server_batch_size', 'Frames per inference micro-batch',
+                                buckets=(1, 2, 4, 8, 16, 32, 64))
+BATCH_WAIT_SECONDS = registry.histogram('pose_server_batch_wait_seconds',
+                                        'Time frames wait for their inference micro-batch to be sent')
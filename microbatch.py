@@ -0,0 +1,81 @@
+import threading
+import time
+
+from metrics import BATCH_SIZE, BATCH_WAIT_SECONDS
+
+
+class MicroBatcher:
+    """Groups items per key into short, time-bounded batches.
+
+    Each key (an inference worker) has a collector thread. The first item
+    submitted for a key opens a batch, which is sent with send(key, items)
+    once it holds max_batch items or max_wait seconds after it opened,
+    whichever comes first. Items keep their submission order, so a session's
+    frames reach its worker in the order they arrived.
+    """
+
+    def __init__(self, keys, send, max_batch=8, max_wait=0.005, clock=time.perf_counter):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._send = send
+        self._clock = clock
+        self._pending = [[] for _ in range(keys)]
+        self._conds = [threading.Condition() for _ in range(keys)]
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+        self._threads = [threading.Thread(target=self._collect, args=(key,), name=f'micro-batch-{key}', daemon=True)
+                         for key in range(keys)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key, item):
+        cond = self._conds[key]
+        with cond:
+            pending = self._pending[key]
+            pending.append((self._clock(), item))
+            # The collector only needs waking to open a batch or to send a full one
+            if len(pending) == 1 or len(pending) == self.max_batch:
+                cond.notify()
+
+    def _collect(self, key):
+        cond = self._conds[key]
+        pending = self._pending[key]
+        while True:
+            with cond:
+                while not pending and not self._closed:
+                    cond.wait()
+                if self._closed:
+                    return
+                deadline = pending[0][0] + self.max_wait
+                while len(pending) < self.max_batch and not self._closed:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        break
+                    cond.wait(remaining)
+                batch = pending[:self.max_batch]
+                del pending[:self.max_batch]
+
+            now = self._clock()
+            BATCH_SIZE.observe(len(batch))
+            for queued, _ in batch:
+                BATCH_WAIT_SECONDS.observe(now - queued)
+            self.batches += 1
+            self.items += len(batch)
+            self._send(key, [item for _, item in batch])
+
+    def stats(self):
+        return {
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': self.batches,
+            'batch_avg': self.items / self.batches if self.batches else 0.0
+        }
+
+    def close(self):
+        self._closed = True
+        for cond in self._conds:
+            with cond:
+                cond.notify()
+        for thread in self._threads:
+            thread.join(timeout=1)
@@ -0,0 +1,111 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+
+from buffers import BufferPool
+from landmarks import landmarks_to_array
+from metrics import COLOR_SECONDS, INFERENCE_SECONDS
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PosePool:
+    """Bounded pool of MediaPipe Pose graphs shared by request threads.
+
+    Each session is pinned to one slot the first time it checks out, so the
+    graph's tracking state (min_tracking_confidence) only ever sees frames from
+    the sessions pinned to it. Slots are handed out round-robin.
+    """
+
+    def __init__(self, factory, size, timeout=2.0):
+        self.size = size
+        self.timeout = timeout
+        self._poses = [factory() for _ in range(size)]
+        self._locks = [threading.Lock() for _ in range(size)]
+        self._next_slot = itertools.count()
+        # RGB copies for inference; frames of a session share a size
+        self._buffers = BufferPool(per_key=size + 1)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def slot_for(self, session):
+        if session.pose_slot is None:
+            session.pose_slot = next(self._next_slot) % self.size
+        return session.pose_slot
+
+    @contextmanager
+    def checkout(self, session, timeout=None):
+        slot = self.slot_for(session)
+        lock = self._locks[slot]
+        timeout = self.timeout if timeout is None else timeout
+
+        start = time.perf_counter()
+        if not lock.acquire(timeout=timeout):
+            with self._stats_lock:
+                self.timeouts += 1
+            raise PoolTimeout(f"Pose slot {slot} busy for more than {timeout}s")
+        waited = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+        try:
+            yield self._poses[slot]
+        finally:
+            lock.release()
+
+    def detect(self, session, frame):
+        """Run pose detection on a BGR frame and return (33, 4) landmarks or None"""
+        start = time.perf_counter()
+        image = self._buffers.acquire(frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=image)
+        image.flags.writeable = False
+        COLOR_SECONDS.observe(time.perf_counter() - start)
+        try:
+            with self.checkout(session) as pose:
+                start = time.perf_counter()
+                results = pose.process(image)
+                INFERENCE_SECONDS.observe(time.perf_counter() - start)
+        finally:
+            # process() has finished with the image once it returns
+            self._buffers.release(image)
+        if not results.pose_landmarks:
+            return None
+        return landmarks_to_array(results.pose_landmarks)
+
+    def warm_up(self, frames):
+        """Run every graph over the given BGR frames once, outside the metrics"""
+        images = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+        for pose, lock in zip(self._poses, self._locks):
+            with lock:
+                for image in images:
+                    pose.process(image)
+
+    def load(self):
+        """Fraction of Pose graphs currently running inference"""
+        return sum(lock.locked() for lock in self._locks) / self.size
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'size': self.size,
+                'busy': sum(lock.locked() for lock in self._locks),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                'wait_max_ms': self.wait_max * 1000
+            }
+
+    def close(self):
+        for pose in self._poses:
+            pose.close()
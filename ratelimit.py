@@ -0,0 +1,76 @@
+import threading
+import time
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by client, stored in preallocated slots.
+
+    Each key gets a slot in two flat lists (tokens left, time of last
+    update), so a check is one dict lookup and a few float operations under
+    a lock. A bucket refills at `rate` tokens per second up to `burst`. When
+    every slot is taken, buckets that have refilled completely are freed:
+    forgetting them is lossless, as a new bucket starts full anyway. If none
+    has, the least recently used one is.
+    """
+
+    def __init__(self, rate, burst, capacity=65536, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = [0.0] * capacity
+        self._updated = [0.0] * capacity
+        self._keys = [None] * capacity
+        self._slots = {}
+        self._free = list(range(capacity - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def hit(self, key):
+        """Take a token for key; returns 0.0 if allowed, else seconds until one is available"""
+        now = self._clock()
+        lock = self._lock
+        lock.acquire()
+        try:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._allocate(key, now)
+                tokens = self.burst
+            else:
+                tokens = self._tokens[slot] + (now - self._updated[slot]) * self.rate
+                if tokens > self.burst:
+                    tokens = self.burst
+            self._updated[slot] = now
+            if tokens >= 1.0:
+                self._tokens[slot] = tokens - 1.0
+                return 0.0
+            self._tokens[slot] = tokens
+            return (1.0 - tokens) / self.rate
+        finally:
+            lock.release()
+
+    def _allocate(self, key, now):
+        if not self._free:
+            self._reclaim(now)
+        slot = self._free.pop()
+        self._keys[slot] = key
+        self._slots[key] = slot
+        return slot
+
+    def _reclaim(self, now):
+        oldest = None
+        for slot, key in enumerate(self._keys):
+            updated = self._updated[slot]
+            if self._tokens[slot] + (now - updated) * self.rate >= self.burst:
+                self._release(slot, key)
+            elif oldest is None or updated < self._updated[oldest]:
+                oldest = slot
+        if not self._free:
+            self._release(oldest, self._keys[oldest])
+
+    def _release(self, slot, key):
+        del self._slots[key]
+        self._keys[slot] = None
+        self._free.append(slot)
@@ -0,0 +1,158 @@
+"""Re-count reps from landmark caches, without running pose detection.
+
+Caches are written by `batch.py --cache`. Thresholds can be overridden on
+the command line to try a new tuning over a whole archive; with --labels
+(a JSON object of recording name -> true reps) the run reports accuracy.
+Recordings are named like batch.py's outputs: by their path relative to
+the directory given, without the cache extension, or by file name when
+files or several paths are given.
+Recordings are smoothed as the server and batch.py do before the vectorised
+state machine runs over them. Smoothing does not depend on the thresholds,
+so the smoothed landmarks are saved next to each cache, keyed by the filter
+parameters, and reused by later runs.
+
+Usage: python replay.py --exercise Squats --start 145 --finish 100 caches/
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from batch import add_smoothing_arguments, smoothing_options
+from exercises import DEFINITIONS, EXERCISES, Exercise
+from landmark_cache import EXTENSION, LandmarkCache
+from smoothing import OneEuroFilter, smooth_sequence
+
+
+def find_caches(paths):
+    caches = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                caches.extend(os.path.join(root, name) for name in files if name.endswith(EXTENSION))
+        else:
+            caches.append(path)
+    return sorted(caches)
+
+
+def tuned_exercise(name, start=None, finish=None, hysteresis=None):
+    """Compile a copy of an exercise definition with some thresholds replaced"""
+    definition = dict(DEFINITIONS[name])
+    if start is not None:
+        definition['start'] = definition['start'][:2] + (start,)
+    if finish is not None:
+        definition['finish'] = definition['finish'][:2] + (finish,)
+    if hysteresis is not None:
+        definition['hysteresis'] = hysteresis
+    return Exercise(name, definition)
+
+
+SMOOTHED_EXTENSION = '.smooth.npy'
+
+
+def smoothed_path(path, smoothing):
+    return f"{path}.{smoothing['min_cutoff']:g}-{smoothing['beta']:g}{SMOOTHED_EXTENSION}"
+
+
+def smoothed_landmarks(cache, smoothing):
+    """(smoothed landmarks, True if read from an earlier run) for a cache"""
+    path = smoothed_path(cache.path, smoothing)
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(cache.path):
+            landmarks = np.load(path, mmap_mode='r')
+            if landmarks.shape == cache.landmarks.shape:
+                return landmarks, True
+    except (OSError, ValueError):
+        pass
+    landmarks = smooth_sequence(cache.landmarks, cache.timestamps, OneEuroFilter(**smoothing))
+    try:
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, landmarks)
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        # Read-only archives are smoothed again on every run
+        print(f"Could not save {path}: {e}", file=sys.stderr)
+    return landmarks, False
+
+
+def recording_name(path, root=None):
+    name = os.path.relpath(path, root) if root else os.path.basename(path)
+    return name[:-len(EXTENSION)] if name.endswith(EXTENSION) else name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='cache files or directories to search')
+    parser.add_argument('--exercise', required=True, choices=sorted(EXERCISES))
+    parser.add_argument('--start', type=float, help='threshold for entering the start stage')
+    parser.add_argument('--finish', type=float, help='threshold for entering the finish stage')
+    parser.add_argument('--hysteresis', type=float)
+    parser.add_argument('--labels', help='JSON file mapping recording name to true rep count')
+    parser.add_argument('--quiet', action='store_true', help='only print the summary')
+    add_smoothing_arguments(parser)
+    args = parser.parse_args()
+    smoothing = smoothing_options(args)
+
+    exercise = tuned_exercise(args.exercise, args.start, args.finish, args.hysteresis)
+    labels = {}
+    if args.labels:
+        with open(args.labels) as f:
+            labels = json.load(f)
+
+    paths = find_caches(args.paths)
+    if not paths:
+        sys.exit("No landmark caches found")
+    # As in batch.py, names mirror the layout so equal file names do not collide
+    root = args.paths[0] if len(args.paths) == 1 and os.path.isdir(args.paths[0]) else None
+
+    frames = 0
+    seconds = 0.0
+    smoothing_seconds = 0.0
+    reused = 0
+    error = 0
+    exact = 0
+    labelled = 0
+    failed = 0
+    for path in paths:
+        name = recording_name(path, root)
+        try:
+            cache = LandmarkCache(path)
+        except (OSError, ValueError, struct.error) as e:
+            # An interrupted batch.py --cache run leaves a partial file behind
+            failed += 1
+            print(f"{name}: skipped, {e}", file=sys.stderr)
+            continue
+        landmarks = cache.landmarks
+        if smoothing is not None:
+            start = time.perf_counter()
+            landmarks, saved = smoothed_landmarks(cache, smoothing)
+            smoothing_seconds += time.perf_counter() - start
+            reused += saved
+        start = time.perf_counter()
+        _, reps = exercise.replay(landmarks)
+        seconds += time.perf_counter() - start
+        frames += len(cache)
+        total = int(reps[-1]) if len(reps) else 0
+
+        truth = labels.get(name)
+        if truth is not None:
+            labelled += 1
+            error += abs(total - truth)
+            exact += total == truth
+        if not args.quiet:
+            print(f"{name}: {total} reps" + (f" (truth {truth})" if truth is not None else ''))
+
+    print(f"{len(paths) - failed} recordings ({failed} skipped), {frames} frames")
+    print(f"replay: {seconds:.2f}s, {frames / seconds if seconds else 0.0:,.0f} frames/s")
+    if smoothing is not None:
+        print(f"smoothing: {smoothing_seconds:.2f}s, {reused} recordings reused from earlier runs")
+    if labelled:
+        print(f"{exact}/{labelled} exact, mean absolute error {error / labelled:.2f} reps")
+
+
+if __name__ == '__main__':
+    main()
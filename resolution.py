@@ -0,0 +1,52 @@
+# Integer downscale factors OpenCV can apply while decoding a JPEG
+SCALES = (1, 2, 4, 8)
+
+
+class ResolutionPolicy:
+    """Per-session choice of decode scale for incoming frames.
+
+    Frames start at the largest scale that keeps them at least target_height
+    tall, and never go below min_height, the smallest input that still holds
+    landmark accuracy. In between, the scale follows the session's measured
+    inference latency: an average over budget halves the resolution, one well
+    under budget doubles it back towards the target.
+    """
+
+    __slots__ = ('scale', 'latency', 'target_height', 'min_height', 'budget')
+
+    def __init__(self, target_height=480, min_height=256, budget=0.05):
+        self.scale = None
+        self.latency = None
+        self.target_height = target_height
+        self.min_height = min_height
+        self.budget = budget
+
+    def choose(self, height):
+        """Return the decode scale for a frame of the given full height"""
+        max_scale = 1
+        preferred = 1
+        for scale in SCALES:
+            if height // scale >= self.min_height:
+                max_scale = scale
+            if height // scale >= self.target_height:
+                preferred = scale
+
+        if self.scale is None:
+            self.scale = preferred
+        elif self.latency is not None:
+            if self.latency > self.budget and self.scale < max_scale:
+                self.scale *= 2
+                self.latency = None
+            elif self.latency < self.budget / 2 and self.scale > preferred:
+                self.scale //= 2
+                self.latency = None
+        # The camera resolution can change between frames
+        self.scale = min(max(self.scale, 1), max_scale)
+        return self.scale
+
+    def observe(self, seconds):
+        """Record the inference latency of one frame"""
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += 0.2 * (seconds - self.latency)
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class RoiTracker:
+    """Crops each frame of a session to the region its person was last seen in.
+
+    The box is the bounding box of the previous frame's landmarks, padded by
+    `padding` of its size on every side. It only moves when the
+    person gets within `margin` of its edge or it has become much larger than
+    needed, so consecutive crops usually share coordinates and the pose
+    graph's own tracking stays valid. Without a pose, or with fewer than
+    `min_landmarks` landmarks above `min_visibility`, the next frame is
+    processed whole. The box is rescaled when the frame size changes, as it
+    does when the session's decode scale moves.
+    """
+
+    __slots__ = ('padding', 'margin', 'min_visibility', 'min_landmarks', 'box', 'frame_size')
+
+    def __init__(self, padding=0.25, margin=0.05, min_visibility=0.5, min_landmarks=8):
+        self.padding = padding
+        self.margin = margin
+        self.min_visibility = min_visibility
+        self.min_landmarks = min_landmarks
+        # (x0, y0, x1, y1) in pixels of a frame_size (height, width) frame,
+        # or None for the whole frame
+        self.box = None
+        self.frame_size = None
+
+    def reset(self):
+        """Process the next frame whole, e.g. after inference on a crop failed"""
+        self.box = None
+
+    def crop(self, frame):
+        """View of frame inside the current box; slicing copies nothing"""
+        if self.box is None:
+            return frame
+        height, width = frame.shape[:2]
+        if (height, width) != self.frame_size:
+            self._rescale(height, width)
+            if self.box is None:
+                return frame
+        x0, y0, x1, y1 = self.box
+        return frame[y0:y1, x0:x1]
+
+    def _rescale(self, height, width):
+        old_height, old_width = self.frame_size
+        x0, y0, x1, y1 = self.box
+        x0 = int(x0 * width / old_width)
+        y0 = int(y0 * height / old_height)
+        x1 = min(width, int(np.ceil(x1 * width / old_width)))
+        y1 = min(height, int(np.ceil(y1 * height / old_height)))
+        self.frame_size = (height, width)
+        self.box = None if x1 - x0 < 2 or y1 - y0 < 2 else (x0, y0, x1, y1)
+
+    def update(self, landmarks, frame_shape):
+        """Map landmarks from the cropped frame back to full-frame coordinates and move the box.
+
+        landmarks come from crop(frame) and may be None; returns them in
+        place, normalised to the full frame.
+        """
+        height, width = frame_shape[:2]
+        box = self.box
+        if box is not None and (height, width) != self.frame_size:
+            # crop() was not given this frame; its box does not apply
+            box = None
+        if landmarks is None:
+            self.box = None
+            return None
+        if box is not None:
+            x0, y0, x1, y1 = box
+            scale = (x1 - x0) / width
+            landmarks[:, 0] = landmarks[:, 0] * scale + x0 / width
+            landmarks[:, 1] = landmarks[:, 1] * ((y1 - y0) / height) + y0 / height
+            # MediaPipe's z has the same scale as x
+            landmarks[:, 2] *= scale
+
+        if np.count_nonzero(landmarks[:, 3] >= self.min_visibility) < self.min_landmarks:
+            self.box = None
+            return landmarks
+        # Every landmark counts towards the box, confident or not: parts the
+        # crop cut off lose confidence, and leaving them out would shrink the
+        # box onto the rest of the body
+        xy = np.clip(landmarks[:, :2], 0.0, 1.0)
+        left, top = xy.min(axis=0) * (width, height)
+        right, bottom = xy.max(axis=0) * (width, height)
+        if box is not None and self._fits(box, left, top, right, bottom, width, height):
+            return landmarks
+
+        pad_x = (right - left) * self.padding
+        pad_y = (bottom - top) * self.padding
+        x0 = max(0, int(left - pad_x))
+        y0 = max(0, int(top - pad_y))
+        x1 = min(width, int(np.ceil(right + pad_x)))
+        y1 = min(height, int(np.ceil(bottom + pad_y)))
+        self.box = None if x1 - x0 < 2 or y1 - y0 < 2 or (x1 - x0) * (y1 - y0) >= width * height else (x0, y0, x1, y1)
+        self.frame_size = (height, width)
+        return landmarks
+
+    def _fits(self, box, left, top, right, bottom, width, height):
+        """The person is still well inside box, and box is not more than twice the padded size"""
+        x0, y0, x1, y1 = box
+        margin_x = (x1 - x0) * self.margin
+        margin_y = (y1 - y0) * self.margin
+        inside = ((left - x0 >= margin_x or x0 == 0) and (x1 - right >= margin_x or x1 == width)
+                  and (top - y0 >= margin_y or y0 == 0) and (y1 - bottom >= margin_y or y1 == height))
+        padded = (right - left) * (1 + 2 * self.padding) * (bottom - top) * (1 + 2 * self.padding)
+        return inside and (x1 - x0) * (y1 - y0) <= 2 * padded
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ExerciseState:
+    __slots__ = ('stage_index', 'reps', 'metrics')
+
+    def __init__(self):
+        self.stage_index = 0
+        self.reps = 0
+        # exercises.RepMetrics, once frames come with timestamps
+        self.metrics = None
+
+
+class Session:
+    __slots__ = ('session_id', 'states', 'last_seen', 'pose_slot', 'resolution', 'roi', 'frame_skip', 'smoothing', 'history', 'events')
+
+    def __init__(self, session_id, now=0.0):
+        self.session_id = session_id
+        self.states = {}
+        self.last_seen = now
+        self.pose_slot = None
+        self.resolution = None
+        self.roi = None
+        self.frame_skip = None
+        self.smoothing = None
+        self.history = None
+        self.events = None
+
+    def state(self, exercise_type):
+        state = self.states.get(exercise_type)
+        if state is None:
+            state = self.states[exercise_type] = ExerciseState()
+        return state
+
+
+class SessionStore:
+    """Session-keyed exercise state with idle-TTL and LRU eviction.
+
+    Sessions are kept in access order, so the least recently used session is
+    always at the front. That makes both eviction policies O(1) per request:
+    the LRU victim is the first entry, and idle sessions are popped from the
+    front until one is still inside the TTL.
+    """
+
+    def __init__(self, max_sessions=50000, ttl=600.0, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def get(self, session_id):
+        now = self._clock()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(session_id, now)
+                if len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+                session.last_seen = now
+            self._expire(now)
+        return session
+
+    def peek(self, session_id):
+        """The session if it is still held, without counting as a use"""
+        return self._sessions.get(session_id)
+
+    def discard(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def expire(self):
+        with self._lock:
+            self._expire(self._clock())
+
+    def _expire(self, now):
+        cutoff = now - self.ttl
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if oldest.last_seen >= cutoff:
+                break
+            sessions.popitem(last=False)
@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+
+
+class OneEuroFilter:
+    """One Euro filter over a (33, 4) landmark array, updated once per frame.
+
+    An exponential smoother whose cutoff frequency rises with each
+    coordinate's speed (Casiez et al., CHI 2012): jitter while a joint is
+    still is smoothed hard, fast movement lags little. All coordinates are
+    filtered at once in a few whole-array operations, so an update costs the
+    same however long the session runs. Visibility is a confidence and is
+    passed through. After a gap of more than max_gap seconds, or a timestamp
+    going backwards, the filter starts over from the new frame.
+    """
+
+    __slots__ = ('min_cutoff', 'beta', 'd_cutoff', 'max_gap', 'value', 'derivative', 'timestamp')
+
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0, max_gap=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.derivative = None
+        self.timestamp = None
+
+    def filter(self, landmarks, now):
+        """Smoothed copy of landmarks seen at time now, in seconds"""
+        dt = 0.0 if self.timestamp is None else now - self.timestamp
+        if self.value is None or not 0 < dt <= self.max_gap:
+            self.value = landmarks.copy()
+            self.derivative = np.zeros_like(landmarks)
+            self.timestamp = now
+            return self.value.copy()
+
+        # alpha = 1 / (1 + tau / dt) with tau = 1 / (2 pi cutoff)
+        rate = 2 * math.pi * dt
+        speed = (landmarks - self.value) / dt
+        derivative = self.derivative + (speed - self.derivative) / (1 + 1 / (rate * self.d_cutoff))
+        cutoff = self.min_cutoff + self.beta * np.abs(derivative)
+        value = self.value + (landmarks - self.value) / (1 + 1 / (rate * cutoff))
+        finite = np.isfinite(value)
+        if finite.all():
+            self.derivative = derivative
+            self.value = value
+        else:
+            # A coordinate missing from this frame (NaN, e.g. an occluded
+            # keypoint) keeps its state; one seen for the first time starts
+            # from the input. NaN never gets into the filter's state
+            present = np.isfinite(landmarks)
+            np.copyto(self.derivative, derivative, where=finite)
+            np.copyto(self.value, value, where=finite)
+            started = present & ~finite & ~np.isfinite(self.value)
+            np.copyto(self.value, landmarks, where=started)
+            self.derivative[started] = 0.0
+        self.value[:, 3] = landmarks[:, 3]
+        self.timestamp = now
+        return self.value.copy()
+
+
+def smooth_sequence(landmarks, timestamps, smoother):
+    """Filter an (N, 33, 4) sequence frame by frame through smoother, as the server does.
+
+    Frames without a pose are all NaN; they stay NaN and do not reach the
+    filter. Returns a new array.
+    """
+    smoothed = np.array(landmarks, dtype=np.float32)
+    detected = ~np.isnan(smoothed[:, :, 1]).all(axis=1)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    for i in np.flatnonzero(detected).tolist():
+        smoothed[i] = smoother.filter(smoothed[i], float(timestamps[i]))
+    return smoothed
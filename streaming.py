@@ -0,0 +1,75 @@
+import threading
+import time
+
+
+class LatestSlot:
+    """Single-slot handoff between threads that only keeps the newest item.
+
+    A producer that outpaces its consumer overwrites the pending item instead
+    of queueing behind it, so the consumer always works on the freshest frame.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._pending = False
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._pending:
+                self.dropped += 1
+            self._item = item
+            self._pending = True
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the newest item, or None once closed or on timeout"""
+        with self._cond:
+            if not self._pending and not self._closed:
+                self._cond.wait(timeout)
+            if not self._pending:
+                return None
+            item = self._item
+            self._item = None
+            self._pending = False
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class RateMeter:
+    """Counts events from one thread and reports their rate to another"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.count = 0
+        self.started = clock()
+        self._last_count = 0
+        self._last_time = self.started
+
+    def tick(self):
+        self.count += 1
+
+    def rate(self):
+        """Events per second since the previous call"""
+        now = self._clock()
+        count = self.count
+        rate = (count - self._last_count) / (now - self._last_time) if now > self._last_time else 0.0
+        self._last_count = count
+        self._last_time = now
+        return rate
+
+    def average(self):
+        elapsed = self._clock() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0